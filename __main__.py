@@ -1,11 +1,24 @@
-# import sys # Removed sys import
+"""
+Interactive entry point: `python -m midi_gen` asks a series of questions and
+generates a MIDI file from the answers.
+
+For scripted runs the prompts are skipped and a JSON object of generation
+options (the same keys `create_arp` accepts) is read instead, either from a
+file given with `--config-file` (`python -m midi_gen --config-file options.json`,
+or the path in the MIDIGEN_CONFIG environment variable) or from stdin when it
+is not a terminal, e.g.
+`echo '{"generation_type": "drone", "bars": 8}' | python -m midi_gen`.
+"""
 # import os # Removed os import
 
 # Removed sys.path modification block
 
-from .arpeggio_generation import create_arp # Updated to use package name
-from typing import Dict, List, Optional
-import questionary # Import questionary
+import argparse
+import json
+import os
+import sys
+from typing import IO, Dict, List, Optional
+from .midi_types import DEFAULT_TICKS_PER_BEAT
 
 # Default values from the previous argparse setup
 DEFAULT_ROOT = 0
@@ -14,11 +27,11 @@ DEFAULT_MODE = 'minor'
 MODE_CHOICES = ['major', 'minor', 'dorian', 'phrygian', 'lydian', 'mixolydian', 'locrian']
 DEFAULT_ARP_STEPS = 8
 
-# Define step choices with musical note lengths
+# Define step choices with musical note lengths as (title, value) pairs
 ARP_STEP_CHOICES = [
-    questionary.Choice("16 steps (16th notes)", value=16),
-    questionary.Choice("8 steps (8th notes)", value=8),
-    questionary.Choice("4 steps (quarter notes)", value=4)
+    ("16 steps (16th notes)", 16),
+    ("8 steps (8th notes)", 8),
+    ("4 steps (quarter notes)", 4)
 ]
 
 DEFAULT_MIN_OCTAVE = 3
@@ -55,19 +68,74 @@ DEFAULT_DRONE_ENABLE_WALKDOWNS = True # Enable melodic walkdowns to doubled note
 DEFAULT_DRONE_WALKDOWN_NUM_STEPS = 2 # Number of steps in the walkdown
 
 # New selectable choices for walkdown step duration
-TICKS_PER_QUARTER_NOTE = 480
+TICKS_PER_QUARTER_NOTE = DEFAULT_TICKS_PER_BEAT
 WALKDOWN_DURATION_CHOICES = [
-    questionary.Choice("Eighth Note (fastest)", value=TICKS_PER_QUARTER_NOTE // 2), # 240 ticks
-    questionary.Choice("Quarter Note", value=TICKS_PER_QUARTER_NOTE),             # 480 ticks
-    questionary.Choice("Half Note", value=TICKS_PER_QUARTER_NOTE * 2),               # 960 ticks
-    questionary.Choice("Whole Note (slowest)", value=TICKS_PER_QUARTER_NOTE * 4)             # 1920 ticks
+    ("Eighth Note (fastest)", TICKS_PER_QUARTER_NOTE // 2), # 240 ticks
+    ("Quarter Note", TICKS_PER_QUARTER_NOTE),             # 480 ticks
+    ("Half Note", TICKS_PER_QUARTER_NOTE * 2),               # 960 ticks
+    ("Whole Note (slowest)", TICKS_PER_QUARTER_NOTE * 4)             # 1920 ticks
 ]
-DEFAULT_DRONE_WALKDOWN_STEP_TICKS = WALKDOWN_DURATION_CHOICES[0].value # Default to Eighth Note
+DEFAULT_DRONE_WALKDOWN_STEP_TICKS = WALKDOWN_DURATION_CHOICES[0][1] # Default to Eighth Note
+
+def _report(lines: List[str]) -> None:
+    """Write a block of console lines with a single stdout write."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def _load_options(source: IO[str], source_name: str) -> Dict:
+    """Read a JSON object of generation options, exiting with a readable message if it is not one."""
+    try:
+        options = json.load(source)
+    except json.JSONDecodeError as e:
+        sys.exit(f"Error: {source_name} is not valid JSON: {e}")
+    if not isinstance(options, dict):
+        sys.exit(f"Error: {source_name} must contain a JSON object of options, not a {type(options).__name__}")
+    return options
+
+def _ask_int(message: str, default: int) -> int:
+    """Prompt for an integer; an empty answer (or Ctrl-C) gives the default."""
+    import questionary
+    answer = questionary.text(message, default=str(default)).ask()
+    return int(answer) if answer else default
+
+def _ask_float(message: str, default: float) -> float:
+    """Prompt for a float; an empty answer (or Ctrl-C) gives the default."""
+    import questionary
+    answer = questionary.text(message, default=str(default)).ask()
+    return float(answer) if answer else float(default)
 
 if __name__ == "__main__":
-    print("Welcome to the MIDI Generator!")
-    print("Please answer the following questions to configure your MIDI output.")
-    print("Press Enter to accept the default value shown in (parentheses).\n")
+    # Imported here so that importing this module (e.g. for its defaults) does not
+    # pull in questionary/prompt_toolkit or the generation stack
+    from .arpeggio_generation import create_arp
+
+    parser = argparse.ArgumentParser(
+        prog="python -m midi_gen",
+        description="Generate an arpeggio or drone MIDI file. Without options the settings are asked "
+                    "interactively, or read as JSON from stdin when it is not a terminal."
+    )
+    parser.add_argument(
+        "--config-file", type=argparse.FileType('r'), default=os.environ.get('MIDIGEN_CONFIG'),
+        help="JSON file of generation options; skips the prompts (default: $MIDIGEN_CONFIG)"
+    )
+    args = parser.parse_args()
+
+    if args.config_file is not None:
+        # Scripted use: take the whole options dict from a JSON file and skip the prompts
+        with args.config_file:
+            create_arp(_load_options(args.config_file, args.config_file.name))
+        sys.exit(0)
+    if not sys.stdin.isatty():
+        # Same, with the JSON piped in on stdin
+        create_arp(_load_options(sys.stdin, "stdin"))
+        sys.exit(0)
+
+    import questionary
+
+    _report([
+        "Welcome to the MIDI Generator!",
+        "Please answer the following questions to configure your MIDI output.",
+        "Press Enter to accept the default value shown in (parentheses).\n"
+    ])
 
     # Ask for generation type FIRST
     generation_type = questionary.select(
@@ -96,10 +164,7 @@ if __name__ == "__main__":
         if root_notes_str:
             root_notes_list = root_notes_str.split()
     else:
-        root_note_int = int(questionary.text(
-            f"Enter the MIDI root note number (0-127, C=0):",
-            default=str(DEFAULT_ROOT)
-        ).ask() or DEFAULT_ROOT)
+        root_note_int = _ask_int(f"Enter the MIDI root note number (0-127, C=0):", DEFAULT_ROOT)
 
     mode = questionary.select(
         "Select the musical mode:",
@@ -107,10 +172,12 @@ if __name__ == "__main__":
         default=DEFAULT_MODE
     ).ask()
 
-    min_octave = int(questionary.text("Minimum octave for notes:", default=str(DEFAULT_MIN_OCTAVE)).ask() or DEFAULT_MIN_OCTAVE)
-    max_octave = int(questionary.text("Maximum octave for notes:", default=str(DEFAULT_MAX_OCTAVE)).ask() or DEFAULT_MAX_OCTAVE)
-    bpm = int(questionary.text("BPM (tempo):", default=str(DEFAULT_BPM)).ask() or DEFAULT_BPM)
-    bars = int(questionary.text("Number of bars:", default=str(DEFAULT_BARS)).ask() or DEFAULT_BARS)
+    min_octave = _ask_int("Minimum octave for notes:", DEFAULT_MIN_OCTAVE)
+    max_octave = _ask_int("Maximum octave for notes:", DEFAULT_MAX_OCTAVE)
+    bpm = _ask_int("BPM (tempo):", DEFAULT_BPM)
+    bars = _ask_int("Number of bars:", DEFAULT_BARS)
+    seed_str = questionary.text("Random seed (leave blank for a different result each run):", default="").ask()
+    seed: Optional[int] = int(seed_str) if seed_str else None
     
     # Set default filename based on generation type
     current_default_filename = DEFAULT_DRONE_FILENAME if generation_type == 'drone' else DEFAULT_FILENAME
@@ -137,30 +204,34 @@ if __name__ == "__main__":
     repeat_pattern: Optional[bool] = None # Arp specific
 
     if generation_type == 'arpeggio':
-        print("\n--- Arpeggio Specific Settings ---")
-        print("Choose how many steps in your arpeggio cycle.")
-        print("Fewer steps = longer notes. The pattern will fill the entire bar.")
+        _report([
+            "\n--- Arpeggio Specific Settings ---",
+            "Choose how many steps in your arpeggio cycle.",
+            "Fewer steps = longer notes. The pattern will fill the entire bar."
+        ])
         arp_steps = questionary.select(
             "Steps per arpeggio cycle:",
-            choices=ARP_STEP_CHOICES,
+            choices=[questionary.Choice(title, value=value) for title, value in ARP_STEP_CHOICES],
             default=8
         ).ask()
         
         # Ask about pattern repetition if using 8 or 4 steps
         repeat_pattern = False
         if arp_steps < 16:
-            print("\nYou can either:")
-            print(f"- Repeat the {arp_steps}-step pattern using 16th notes")
-            print(f"- Use longer notes ({arp_steps} {'8th' if arp_steps == 8 else 'quarter'} notes)")
+            _report([
+                "\nYou can either:",
+                f"- Repeat the {arp_steps}-step pattern using 16th notes",
+                f"- Use longer notes ({arp_steps} {'8th' if arp_steps == 8 else 'quarter'} notes)"
+            ])
             repeat_pattern = questionary.confirm(
                 "Would you like to repeat the pattern using 16th notes?",
                 default=False
             ).ask()
         
         arp_mode = questionary.select("Arpeggiator mode:", choices=ARP_MODE_CHOICES, default=DEFAULT_ARP_MODE).ask()
-        range_octaves = int(questionary.text("Arpeggio range in octaves (from min_octave):", default=str(DEFAULT_RANGE_OCTAVES)).ask() or DEFAULT_RANGE_OCTAVES)
-        evolution_rate = float(questionary.text("Arpeggio evolution rate (0.0 to 1.0):", default=str(DEFAULT_EVOLUTION_RATE)).ask() or DEFAULT_EVOLUTION_RATE)
-        repetition_factor = int(questionary.text("Arpeggio repetition factor (1-10):", default=str(DEFAULT_REPETITION_FACTOR)).ask() or DEFAULT_REPETITION_FACTOR)
+        range_octaves = _ask_int("Arpeggio range in octaves (from min_octave):", DEFAULT_RANGE_OCTAVES)
+        evolution_rate = _ask_float("Arpeggio evolution rate (0.0 to 1.0):", DEFAULT_EVOLUTION_RATE)
+        repetition_factor = _ask_int("Arpeggio repetition factor (1-10):", DEFAULT_REPETITION_FACTOR)
     
     # --- Drone Specific Questions (Placeholder for future) ---
     drone_base_velocity: Optional[int] = None
@@ -174,19 +245,10 @@ if __name__ == "__main__":
 
     if generation_type == 'drone':
         print("\n--- Drone Specific Settings ---")
-        drone_base_velocity = int(questionary.text("Base MIDI velocity for drone notes (0-127):", default=str(DEFAULT_DRONE_BASE_VELOCITY)).ask() or DEFAULT_DRONE_BASE_VELOCITY)
-        drone_variation_interval_bars = int(questionary.text(
-            f"Drone variation interval in bars (how often voicing changes, e.g., 1-4):", 
-            default=str(DEFAULT_DRONE_VARIATION_INTERVAL_BARS)
-        ).ask() or DEFAULT_DRONE_VARIATION_INTERVAL_BARS)
-        drone_min_notes_held = int(questionary.text(
-            f"Minimum notes to hold in drone chord (e.g., 2):", 
-            default=str(DEFAULT_DRONE_MIN_NOTES_HELD)
-        ).ask() or DEFAULT_DRONE_MIN_NOTES_HELD)
-        drone_octave_doubling_chance = float(questionary.text(
-            f"Chance (0.0-1.0) to double a drone note in another octave:",
-            default=str(DEFAULT_DRONE_OCTAVE_DOUBLING_CHANCE)
-        ).ask() or DEFAULT_DRONE_OCTAVE_DOUBLING_CHANCE)
+        drone_base_velocity = _ask_int("Base MIDI velocity for drone notes (0-127):", DEFAULT_DRONE_BASE_VELOCITY)
+        drone_variation_interval_bars = _ask_int(f"Drone variation interval in bars (how often voicing changes, e.g., 1-4):", DEFAULT_DRONE_VARIATION_INTERVAL_BARS)
+        drone_min_notes_held = _ask_int(f"Minimum notes to hold in drone chord (e.g., 2):", DEFAULT_DRONE_MIN_NOTES_HELD)
+        drone_octave_doubling_chance = _ask_float(f"Chance (0.0-1.0) to double a drone note in another octave:", DEFAULT_DRONE_OCTAVE_DOUBLING_CHANCE)
         drone_allow_octave_shifts = questionary.confirm(
             f"Allow drone notes to occasionally shift their primary octave?",
             default=DEFAULT_DRONE_ALLOW_OCTAVE_SHIFTS
@@ -196,13 +258,10 @@ if __name__ == "__main__":
             default=DEFAULT_DRONE_ENABLE_WALKDOWNS
         ).ask()
         if drone_enable_walkdowns:
-            drone_walkdown_num_steps = int(questionary.text(
-                f"Number of steps in walkdown (e.g., 1-3):",
-                default=str(DEFAULT_DRONE_WALKDOWN_NUM_STEPS)
-            ).ask() or DEFAULT_DRONE_WALKDOWN_NUM_STEPS)
+            drone_walkdown_num_steps = _ask_int(f"Number of steps in walkdown (e.g., 1-3):", DEFAULT_DRONE_WALKDOWN_NUM_STEPS)
             drone_walkdown_step_ticks = questionary.select(
                 "Duration of each walkdown step:",
-                choices=WALKDOWN_DURATION_CHOICES,
+                choices=[questionary.Choice(title, value=value) for title, value in WALKDOWN_DURATION_CHOICES],
                 default=DEFAULT_DRONE_WALKDOWN_STEP_TICKS
             ).ask()
 
@@ -214,11 +273,11 @@ if __name__ == "__main__":
 
     enable_tape_wobble = questionary.confirm("Enable Tape Wobble pitch effect?", default=DEFAULT_TAPE_WOBBLE_ENABLED).ask()
     if enable_tape_wobble:
-        wow_rate = float(questionary.text("Wow Rate (Hz, slow pitch drift, e.g., 0.1-1.0):", default=str(DEFAULT_WOW_RATE_HZ)).ask() or DEFAULT_WOW_RATE_HZ)
-        wow_depth = float(questionary.text("Wow Depth (e.g., 5-50):", default=str(DEFAULT_WOW_DEPTH_CENTS)).ask() or DEFAULT_WOW_DEPTH_CENTS)
-        flutter_rate = float(questionary.text("Flutter Rate (Hz, faster pitch drift, e.g., 3-12):", default=str(DEFAULT_FLUTTER_RATE_HZ)).ask() or DEFAULT_FLUTTER_RATE_HZ)
-        flutter_depth = float(questionary.text("Flutter Depth (e.g., 1-10):", default=str(DEFAULT_FLUTTER_DEPTH_CENTS)).ask() or DEFAULT_FLUTTER_DEPTH_CENTS)
-        wobble_randomness = float(questionary.text("Wobble Randomness (0.0-1.0):", default=str(DEFAULT_WOBBLE_RANDOMNESS)).ask() or DEFAULT_WOBBLE_RANDOMNESS)
+        wow_rate = _ask_float("Wow Rate (Hz, slow pitch drift, e.g., 0.1-1.0):", DEFAULT_WOW_RATE_HZ)
+        wow_depth = _ask_float("Wow Depth (e.g., 5-50):", DEFAULT_WOW_DEPTH_CENTS)
+        flutter_rate = _ask_float("Flutter Rate (Hz, faster pitch drift, e.g., 3-12):", DEFAULT_FLUTTER_RATE_HZ)
+        flutter_depth = _ask_float("Flutter Depth (e.g., 1-10):", DEFAULT_FLUTTER_DEPTH_CENTS)
+        wobble_randomness = _ask_float("Wobble Randomness (0.0-1.0):", DEFAULT_WOBBLE_RANDOMNESS)
         depth_units = questionary.select(
             "Units for Wow/Flutter Depth?",
             choices=['cents', 'semitones'],
@@ -240,10 +299,10 @@ if __name__ == "__main__":
         default=DEFAULT_HUMANIZE_ENABLED
     ).ask()
     if enable_humanize:
-        humanize_range = int(questionary.text("Humanize: Velocity variation range:", default=str(DEFAULT_HUMANIZE_RANGE)).ask() or DEFAULT_HUMANIZE_RANGE)
+        humanize_range = _ask_int("Humanize: Velocity variation range:", DEFAULT_HUMANIZE_RANGE)
         effects_config.append({
             'name': 'humanize_velocity',
-            'humanization_range': humanize_range
+            'humanization_range': humanize_range # The effect factory clamps it to 0..MAX_HUMANIZE_RANGE
         })
 
     options: Dict = {
@@ -255,6 +314,7 @@ if __name__ == "__main__":
         'max_octave': max_octave,
         'bpm': bpm,
         'bars': bars,
+        'seed': seed,
         'filename': base_filename, # Filename prefixing will be handled in arpeggio_generation.py
         'use_chord_tones': use_chord_tones,
         'effects_config': effects_config, # Pass effects, arpeggio_generation will decide to use them
@@ -284,9 +344,10 @@ if __name__ == "__main__":
     else:
          options['root'] = 0 # Default if multiple root notes are primary for arpeggio logic, less relevant for drone with explicit roots
 
-    print("\nGenerating MIDI with the following options:")
-    for key, value in options.items():
-        print(f"- {key}: {value}")
-    print("\n")
+    _report([
+        "\nGenerating MIDI with the following options:",
+        *(f"- {key}: {value}" for key, value in options.items()),
+        "\n"
+    ])
     
     create_arp(options)
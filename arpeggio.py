@@ -1,8 +1,25 @@
-from .scale import get_scale
+from .scale import get_scale_tuple
+from bisect import bisect_left
+from typing import Optional
 import random
-import math
 
-def create_arpeggio(root: int, mode: str, length: int = 16, min_octave: int = 4, max_octave: int = 6, arp_mode: str = 'up', range_octaves: int = 1, evolution_rate: float = 0.1, repetition_factor: int = 5, rhythmic_variation: bool = False, chord_progression: list = None, embellish: bool = False, use_chord_tones: bool = True) -> list:
+def _cycle_to_length(notes: list, length: int) -> list:
+    """Repeats `notes` end to end and trims the result to exactly `length` notes."""
+    if length <= 0:
+        return []
+    return (notes * (length // len(notes) + 1))[:length]
+
+def _nearest_note(sorted_notes: list, note: int) -> int:
+    """Returns the note in `sorted_notes` closest to `note`, preferring the lower one on a tie."""
+    pos = bisect_left(sorted_notes, note)
+    if pos == 0:
+        return sorted_notes[0]
+    if pos == len(sorted_notes):
+        return sorted_notes[-1]
+    lower, upper = sorted_notes[pos - 1], sorted_notes[pos]
+    return lower if note - lower <= upper - note else upper
+
+def create_arpeggio(root: int, mode: str, length: int = 16, min_octave: int = 4, max_octave: int = 6, arp_mode: str = 'up', range_octaves: int = 1, evolution_rate: float = 0.1, repetition_factor: int = 5, rhythmic_variation: bool = False, chord_progression: list = None, embellish: bool = False, use_chord_tones: bool = True, rng: Optional[random.Random] = None) -> list:
     """
     Creates an arpeggio with various musical enhancements.
 
@@ -20,10 +37,20 @@ def create_arpeggio(root: int, mode: str, length: int = 16, min_octave: int = 4,
     :param embellish: If True, adds passing tones and neighbor notes.
     :param use_chord_tones: If True (default), arpeggiates using only chord tones (1,3,5 of the mode). 
                             If False, uses all notes of the scale.
+    :param rng: Random generator to draw from. Defaults to the module-level `random` state.
     :return: List of MIDI note numbers forming the arpeggio with enhancements.
     """
+    if length <= 0:
+        return []
+
+    if rng is None:
+        rng = random  # Module-level functions share the Random interface
+    # Bound once; these are called per note in the loops below
+    rand = rng.random
+    choice = rng.choice
+    
     # Get the base pitch classes (either chord tones or full scale)
-    pitch_classes = get_scale(root, mode, use_chord_tones=use_chord_tones)
+    pitch_classes = get_scale_tuple(root, mode, use_chord_tones)
     
     # Ensure pitch_classes is not empty before proceeding, especially if a mode might result in no chord tones (e.g. if definition was missing)
     if not pitch_classes:
@@ -32,11 +59,10 @@ def create_arpeggio(root: int, mode: str, length: int = 16, min_octave: int = 4,
         # A more robust solution might be to raise an error or log a warning.
         pitch_classes = [root % 12] 
 
-    arpeggio_source_notes = []
-    
     # Build the source notes across octaves
-    for octave in range(min_octave, min_octave + range_octaves + 1):
-        arpeggio_source_notes.extend([note + (octave * 12) for note in pitch_classes])
+    arpeggio_source_notes = [pc + octave * 12
+                             for octave in range(min_octave, min_octave + range_octaves + 1)
+                             for pc in pitch_classes]
     
     # Ensure arpeggio_source_notes is not empty if pitch_classes was valid but octaves didn't yield notes
     if not arpeggio_source_notes:
@@ -60,23 +86,9 @@ def create_arpeggio(root: int, mode: str, length: int = 16, min_octave: int = 4,
         half_length = length // 2
         remaining_length = length - half_length
 
-        source_up = list(arpeggio_source_notes)
-        for i in range(half_length):
-            if source_up: # Check if source_up is not empty
-                base_pattern.append(source_up[i % len(source_up)])
-            elif arpeggio_source_notes: # Fallback to original source if source_up became empty (should not happen)
-                base_pattern.append(arpeggio_source_notes[i % len(arpeggio_source_notes)])
-            else: # Absolute fallback
-                base_pattern.append((root % 12) + min_octave * 12)
-        
-        source_down = list(reversed(arpeggio_source_notes))
-        for i in range(remaining_length):
-            if source_down: # Check if source_down is not empty
-                base_pattern.append(source_down[i % len(source_down)])
-            elif arpeggio_source_notes: # Fallback
-                base_pattern.append(list(reversed(arpeggio_source_notes))[i % len(list(reversed(arpeggio_source_notes)))])
-            else: # Absolute fallback
-                base_pattern.append((root % 12) + min_octave * 12)
+        # Cycle up through the source for the first half, then back down for the rest
+        base_pattern = (_cycle_to_length(arpeggio_source_notes, half_length)
+                        + _cycle_to_length(arpeggio_source_notes[::-1], remaining_length))
         # base_pattern is now of 'length' and ready.
     else:
         # Original logic for 'up', 'down', 'random', 'order' that uses an intermediate 'pattern'
@@ -88,12 +100,12 @@ def create_arpeggio(root: int, mode: str, length: int = 16, min_octave: int = 4,
             intermediate_pattern = list(reversed(arpeggio_source_notes))
         elif arp_mode == 'random':
             if arpeggio_source_notes: # Check for empty list
-                 intermediate_pattern = [random.choice(arpeggio_source_notes) for _ in range(len(arpeggio_source_notes))] # Create a pattern of same length as source for now
+                 intermediate_pattern = [choice(arpeggio_source_notes) for _ in range(len(arpeggio_source_notes))] # Create a pattern of same length as source for now
             else:
                  intermediate_pattern = [(root % 12 + min_octave * 12)]
         elif arp_mode == 'order': 
-            intermediate_pattern = list(arpeggio_source_notes) 
-            random.shuffle(intermediate_pattern)
+            # sample() returns a shuffled copy, so no separate copy is needed
+            intermediate_pattern = rng.sample(arpeggio_source_notes, len(arpeggio_source_notes))
         else: # Default or unrecognized arp_mode (should not happen if CLI is validated)
             intermediate_pattern = list(arpeggio_source_notes) # Default to 'up' behavior for pattern source
 
@@ -103,25 +115,25 @@ def create_arpeggio(root: int, mode: str, length: int = 16, min_octave: int = 4,
         # Adjust for repetition_factor using the intermediate_pattern
         repetition_factor = max(1, min(10, repetition_factor))
         if len(intermediate_pattern) > 0:
-            # Expand based on length of intermediate_pattern relative to desired final 'length'
-            expanded_pattern = intermediate_pattern * (length // len(intermediate_pattern) + 1)
+            # Expand based on length of intermediate_pattern relative to desired final 'length'.
+            # intermediate_pattern is always a fresh list, so a single repeat needs no copy.
+            repeats = length // len(intermediate_pattern) + 1
+            expanded_pattern = intermediate_pattern * repeats if repeats > 1 else intermediate_pattern
             if repetition_factor < 10:
-                for i in range(len(expanded_pattern)):
-                    if random.random() > (repetition_factor / 10):
-                        if arpeggio_source_notes: 
-                            expanded_pattern[i] = random.choice(arpeggio_source_notes)
+                rep_threshold = repetition_factor / 10  # Chance of keeping each pattern note
+                expanded_pattern = [choice(arpeggio_source_notes) if rand() > rep_threshold else note
+                                    for note in expanded_pattern]
             base_pattern = expanded_pattern[:length]
         else:
             base_pattern = [] # Should be caught by earlier check, but as safeguard
 
-    # Ensure base_pattern is exactly `length` notes, especially if fallbacks occurred or length was 0.
+    # Ensure base_pattern is exactly `length` notes, especially if fallbacks occurred.
     if len(base_pattern) != length:
-        # If too short (e.g. length was 0 or pattern construction failed), fill with root note or truncate.
-        # This primarily guards against length=0 or issues if arpeggio_source_notes was initially empty.
+        # If too short (e.g. pattern construction failed), fill with root note or truncate.
+        # This primarily guards against issues if arpeggio_source_notes was initially empty.
         if not arpeggio_source_notes and length > 0 : arpeggio_source_notes = [(root % 12 + min_octave * 12)]
         
-        if length == 0: base_pattern = []
-        elif len(base_pattern) < length and arpeggio_source_notes:
+        if len(base_pattern) < length and arpeggio_source_notes:
             # Tile the first note of arpeggio_source_notes to fill remaining space
             filler_note = arpeggio_source_notes[0]
             base_pattern.extend([filler_note] * (length - len(base_pattern)))
@@ -132,92 +144,77 @@ def create_arpeggio(root: int, mode: str, length: int = 16, min_octave: int = 4,
              for i in range(length):
                  base_pattern.append(source_fill[i % len(source_fill)])
 
-    # Rhythmic Variation (ensure base_pattern is not empty)
-    if rhythmic_variation and base_pattern:
-        syncopated = [note if i % 4 != 3 else None for i, note in enumerate(base_pattern)]
-        tuplets = []
-        for i in range(0, length, 3):
-            if i + 2 < length:
-                tuplets.extend(base_pattern[i:i+3])
-            else:
-                tuplets.extend(base_pattern[i:])
-                if len(base_pattern[i:]) < 3 and length > len(base_pattern[i:]):
-                     tuplets.extend([None] * (3 - len(base_pattern[i:]))) 
-        base_pattern = syncopated if random.choice([True, False]) else tuplets
+    # Rhythmic Variation: syncopation or tuplets, picked at random. Rests are dropped from the
+    # returned notes, so syncopation just skips the last 16th of every beat, and the tuplet
+    # variant (which only padded the tail with rests) leaves the notes unchanged.
+    syncopate = rhythmic_variation and bool(base_pattern) and choice([True, False])
+
+    # Nothing left to change per note, so the base pattern is the arpeggio
+    if not (syncopate or chord_progression or embellish or evolution_rate > 0):
+        return base_pattern
 
-    current_arpeggio = []
     # Harmonic Variation with Chord Progression
-    if chord_progression and base_pattern:
-        prog_arpeggio = []
-        current_chord_index = 0
-        # Determine notes per chord segment
-        notes_per_segment = length // len(chord_progression) if len(chord_progression) > 0 else length
-        
-        for i, note_in_pattern in enumerate(base_pattern):
-            if notes_per_segment > 0 and i % notes_per_segment == 0 and i // notes_per_segment < len(chord_progression):
-                current_chord_index = i // notes_per_segment
-            
-            new_root = chord_progression[current_chord_index]
-            # Get pitch classes for the new chord root and current mode (and use_chord_tones setting)
-            current_chord_pitch_classes = get_scale(new_root, mode, use_chord_tones=use_chord_tones)
-            
-            # Build full range of notes for this chord
-            current_chord_full_range = []
-            for octave in range(min_octave, min_octave + range_octaves + 1):
-                current_chord_full_range.extend([pc + (octave * 12) for pc in current_chord_pitch_classes])
-            
-            if not current_chord_full_range: # Fallback if no notes generated
-                prog_arpeggio.append(note_in_pattern) # Keep original pattern note
-                continue
-
-            if note_in_pattern is not None:
+    step_chord_ranges = None
+    if chord_progression:
+        # Build the full range of notes for each chord once, not once per pattern note.
+        # Pitch classes are sorted and octaves ascend, so each range is already sorted.
+        chord_full_ranges = [
+            [pc + octave * 12
+             for octave in range(min_octave, min_octave + range_octaves + 1)
+             for pc in get_scale_tuple(chord_root, mode, use_chord_tones)]
+            for chord_root in chord_progression
+        ]
+        # Lay the chords out per step: each chord covers notes_per_segment steps and the
+        # last one also takes the remainder (all steps use the first chord if segments are empty)
+        num_chords = len(chord_progression)
+        notes_per_segment = length // num_chords
+        if notes_per_segment > 0:
+            step_chord_ranges = [chord_range for chord_range in chord_full_ranges for _ in range(notes_per_segment)]
+            step_chord_ranges += [chord_full_ranges[-1]] * (length - len(step_chord_ranges))
+        else:
+            step_chord_ranges = [chord_full_ranges[0]] * length
+
+    # Source notes are unique, so a dict gives the same position as list.index without the scan
+    source_index = {note: i for i, note in enumerate(arpeggio_source_notes)}
+    num_source_notes = len(arpeggio_source_notes)
+    evolve = evolution_rate > 0
+
+    # Rests, chord mapping, embellishment and evolution are applied to each note in a single pass
+    current_arpeggio = []
+    append = current_arpeggio.append
+    for i, note in enumerate(base_pattern):
+        if step_chord_ranges is not None:
+            current_chord_full_range = step_chord_ranges[i]
+            if current_chord_full_range:
                 # Map current pattern note to the closest note in the new chord's full range
-                prog_arpeggio.append(min(current_chord_full_range, key=lambda x: abs(x - note_in_pattern)))
-            else:
-                prog_arpeggio.append(None) # Preserve rests from rhythmic variation
-        current_arpeggio = prog_arpeggio
-    else:
-        current_arpeggio = list(base_pattern) # Ensure it's a mutable list
-
-    # Melodic Embellishments (ensure current_arpeggio and arpeggio_source_notes are not empty)
-    if embellish and current_arpeggio and arpeggio_source_notes:
-        embellished_arpeggio = []
-        for note in current_arpeggio:
-            if note is not None:
-                if random.random() < 0.3:  # 30% chance for embellishment
-                    # Ensure arpeggio_source_notes has notes to pick from for embellishment
-                    # And that the current note is actually in arpeggio_source_notes to find its index
-                    try:
-                        index = arpeggio_source_notes.index(note % 12 + (note // 12) * 12) # Normalize note to find in source
-                        if random.random() < 0.5:  # Passing tone
-                            embellished_arpeggio.append(arpeggio_source_notes[(index + 1) % len(arpeggio_source_notes)])
-                        else:  # Neighbor note
-                            embellished_arpeggio.append(arpeggio_source_notes[(index + random.choice([-1, 1])) % len(arpeggio_source_notes)])
-                    except ValueError: # Note not in arpeggio_source_notes, skip embellishment for this note
-                        pass      
-                embellished_arpeggio.append(note)
-            else:
-                embellished_arpeggio.append(None)
-        current_arpeggio = embellished_arpeggio
-
-    # Evolution Mechanism (ensure current_arpeggio and arpeggio_source_notes are not empty)
-    if evolution_rate > 0 and current_arpeggio and arpeggio_source_notes:
-        evolved_arpeggio = []
-        for i, note in enumerate(current_arpeggio):
-            if note is not None and random.random() < evolution_rate:
-                if random.random() < 0.5:
-                    try:
-                        index = arpeggio_source_notes.index(note % 12 + (note // 12) * 12) # Normalize note
-                        new_index = (index + random.choice([-1, 1])) % len(arpeggio_source_notes)
-                        evolved_arpeggio.append(arpeggio_source_notes[new_index])
-                    except ValueError:
-                        evolved_arpeggio.append(random.choice(arpeggio_source_notes)) # Fallback if note not in source
+                note = _nearest_note(current_chord_full_range, note)
+
+        if syncopate and i % 4 == 3:
+            continue  # Rest
+
+        # Melodic Embellishments: may precede the note with a passing tone or neighbor note
+        out_notes = (note,)
+        if embellish and rand() < 0.3:  # 30% chance for embellishment
+            # Only notes that are in arpeggio_source_notes can be embellished
+            index = source_index.get(note)
+            if index is not None:
+                if rand() < 0.5:  # Passing tone
+                    out_notes = (arpeggio_source_notes[(index + 1) % num_source_notes], note)
+                else:  # Neighbor note
+                    out_notes = (arpeggio_source_notes[(index + choice((-1, 1))) % num_source_notes], note)
+
+        # Evolution Mechanism
+        for out_note in out_notes:
+            if evolve and rand() < evolution_rate:
+                if rand() < 0.5:
+                    index = source_index.get(out_note)
+                    if index is not None:
+                        out_note = arpeggio_source_notes[(index + choice((-1, 1))) % num_source_notes]
+                    else:
+                        out_note = choice(arpeggio_source_notes)  # Fallback if note not in source
                 else:
-                    evolved_arpeggio.append(random.choice(arpeggio_source_notes))
-            else:
-                evolved_arpeggio.append(note)
-        current_arpeggio = evolved_arpeggio
+                    out_note = choice(arpeggio_source_notes)
+            append(out_note)
 
-    # Remove None values and ensure correct length
-    final_arpeggio = [note for note in current_arpeggio if note is not None]
-    return final_arpeggio[:length] if length > 0 else final_arpeggio
+    # Ensure correct length; the list only outgrows `length` when embellishments were inserted
+    return current_arpeggio if len(current_arpeggio) <= length else current_arpeggio[:length]
@@ -1,71 +1,104 @@
+import logging
 import os
+import random
+import sys
+from dataclasses import dataclass, field
 from .notes import note_str_to_midi, note_to_name
 from .arpeggio import create_arpeggio
-from .drone_generation import generate_drone_events 
+from .drone_generation import DroneOptions, generate_drone_events
 from .midi import create_midi_file
 from typing import Dict, List, Optional, Tuple
 from .effects import EffectRegistry
 from .effects_base import MidiEffect
+from .options import FromOptionsMixin
+
+logger = logging.getLogger(__name__)
+
+# Generated files are written next to the package; resolve the folder once at import
+OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generated")
+
+@dataclass(frozen=True)
+class ArpOptions(FromOptionsMixin):
+    """Settings create_arp reads from the CLI options dict, read once per run."""
+    root: int = 0
+    root_notes: Optional[List[str]] = None
+    generation_type: str = 'arpeggio'
+    mode: str = 'major'
+    bars: int = 16
+    min_octave: int = 4
+    max_octave: int = 6
+    use_chord_tones: bool = True
+    seed: Optional[int] = None
+    effects_config: List[Dict] = field(default_factory=list)
+    # Arpeggio-specific options
+    arp_steps: int = 8
+    arp_mode: str = 'up'
+    range_octaves: int = 1
+    evolution_rate: float = 0.1
+    repetition_factor: int = 5
+    repeat_pattern: bool = False
 
 def create_arp(options: Dict):
     """
     Main function to generate MIDI data based on given options.
     """
-    root = options.get('root', 0)
-    root_notes_str_param = options.get('root_notes', None)
-    generation_type = options.get('generation_type', 'arpeggio')
+    # Read every setting once up front
+    opts = ArpOptions.from_options(options)
+    root = opts.root
+    root_notes_str_param = opts.root_notes
+    generation_type = opts.generation_type
+    mode = opts.mode
+    bars = opts.bars
+    min_octave = opts.min_octave
+    max_octave = opts.max_octave
+    use_chord_tones = opts.use_chord_tones
+    
+    # Arpeggio-specific options
+    arp_steps = opts.arp_steps
+    arp_mode = opts.arp_mode
+    range_octaves = opts.range_octaves
+    evolution_rate = opts.evolution_rate
+    repetition_factor = opts.repetition_factor
     
-    print(f"[DEBUG] Generation Type: {generation_type}")
-    print(f"[DEBUG] root_notes_str_param from options: {root_notes_str_param}")
+    # A seeded generator makes the whole run reproducible; None seeds from system entropy
+    rng = random.Random(opts.seed)
+    
+    logger.debug("Generation Type: %s", generation_type)
+    logger.debug("root_notes_str_param from options: %s", root_notes_str_param)
 
     processed_root_notes_midi: List[int] = []
     if root_notes_str_param: 
         processed_root_notes_midi = [note_str_to_midi(note) for note in root_notes_str_param]
     else:
-        processed_root_notes_midi = [root] * options.get('bars', 16)
-    
-    print(f"[DEBUG] Processed root_notes (MIDI numbers): {processed_root_notes_midi}")
-    print(f"[DEBUG] Length of processed root_notes: {len(processed_root_notes_midi) if processed_root_notes_midi else 0}")
-
-    mode = options.get('mode', 'major')
-    bars = options.get('bars', 16)
-    min_octave = options.get('min_octave', 4)
-    max_octave = options.get('max_octave', 6)
-    use_chord_tones = options.get('use_chord_tones', True)
+        processed_root_notes_midi = [root] * bars
     
-    # Arpeggio-specific options
-    arp_steps = options.get('arp_steps', 8)
-    arp_mode = options.get('arp_mode', 'up')
-    range_octaves = options.get('range_octaves', 1)
-    evolution_rate = options.get('evolution_rate', 0.1)
-    repetition_factor = options.get('repetition_factor', 5)
+    logger.debug("Processed root_notes (MIDI numbers): %s", processed_root_notes_midi)
+    logger.debug("Length of processed root_notes: %d", len(processed_root_notes_midi))
 
     # Create effects using the registry
     active_effects: List[MidiEffect] = []
-    effects_config = options.get('effects_config', [])
+    effects_config = opts.effects_config
     
-    print("\n[DEBUG] Creating effects:")
+    logger.debug("Creating effects:")
     
     # Add other effects
     for effect_conf in effects_config:
         effect_name = effect_conf.get('name', '')
-        print(f"[DEBUG] Processing effect: {effect_name}")
-        print(f"[DEBUG] Effect configuration: {effect_conf}")
+        logger.debug("Processing effect: %s", effect_name)
+        logger.debug("Effect configuration: %s", effect_conf)
         
-        if effect := EffectRegistry.create_effect(effect_conf):
-            print(f"[DEBUG] Successfully created effect: {effect_name}")
+        if effect := EffectRegistry.create_effect(effect_conf, rng=rng):
+            logger.debug("Successfully created effect: %s", effect_name)
             active_effects.append(effect)
         else:
-            print(f"[WARNING] Failed to create effect: {effect_name}")
+            logger.warning("Failed to create effect: %s", effect_name)
 
     if generation_type == 'arpeggio':
         # Each bar has 16 16th notes
         steps_per_bar = 16
-        ticks_per_beat = 480  # Standard MIDI ticks per quarter note
-        ticks_per_16th = ticks_per_beat // 4
         
         # Get pattern repetition setting
-        repeat_pattern = options.get('repeat_pattern', False)
+        repeat_pattern = opts.repeat_pattern
         
         # Calculate note length based on number of steps and repetition setting
         # If repeating or using 16 steps: each note is a 16th note
@@ -74,55 +107,69 @@ def create_arp(options: Dict):
             steps_per_note = 1  # 16th notes
             repeats_per_bar = steps_per_bar // arp_steps
         else:
-            steps_per_note = steps_per_bar // arp_steps  # 2 for 8 steps, 4 for 4 steps
+            # 2 for 8 steps, 4 for 4 steps; more than 16 steps still gets one 16th per note
+            steps_per_note = max(1, steps_per_bar // arp_steps)
             repeats_per_bar = 1
         
-        print(f"[DEBUG] Steps per bar: {steps_per_bar}")
-        print(f"[DEBUG] Arp steps: {arp_steps}")
-        print(f"[DEBUG] Steps per note: {steps_per_note}")
-        print(f"[DEBUG] Pattern repeats per bar: {repeats_per_bar}")
-        print(f"[DEBUG] Using {'16th' if steps_per_note == 1 else '8th' if steps_per_note == 2 else 'quarter'} notes")
+        logger.debug("Steps per bar: %d", steps_per_bar)
+        logger.debug("Arp steps: %s", arp_steps)
+        logger.debug("Steps per note: %d", steps_per_note)
+        logger.debug("Pattern repeats per bar: %d", repeats_per_bar)
+        logger.debug("Using %s notes", '16th' if steps_per_note == 1 else '8th' if steps_per_note == 2 else 'quarter')
         
         # This will hold our flat list of notes
         final_event_list: List[Optional[int]] = []
         
+        # Without evolution or resampling create_arpeggio draws nothing from rng, so its
+        # result depends only on the root and segments sharing a root can reuse it
+        deterministic_pattern = evolution_rate <= 0 and (
+            arp_mode == 'up_down' or (arp_mode not in ('random', 'order') and repetition_factor >= 10)
+        )
+        pattern_cache: Dict[int, List[int]] = {}
+        
         if processed_root_notes_midi:
-            bars_per_segment = bars // len(processed_root_notes_midi) if len(processed_root_notes_midi) > 0 else bars
+            # Split the bars evenly across roots; the last root also takes the leftover bars
+            bars_per_segment, leftover_bars = divmod(bars, len(processed_root_notes_midi))
+            last_idx = len(processed_root_notes_midi) - 1
             
             for idx, current_root_midi in enumerate(processed_root_notes_midi):
                 num_bars_for_segment = bars_per_segment
-                if idx == len(processed_root_notes_midi) - 1:
-                    num_bars_for_segment = bars - (bars_per_segment * idx)
+                if idx == last_idx:
+                    num_bars_for_segment += leftover_bars
                 if num_bars_for_segment <= 0: continue
 
                 # create_arpeggio returns a pattern for one cycle (length = arp_steps)
-                arpeggio_cycle_pattern = create_arpeggio(
-                    current_root_midi, mode, arp_steps, min_octave, max_octave, 
-                    arp_mode, range_octaves, use_chord_tones=use_chord_tones,
-                    evolution_rate=evolution_rate, repetition_factor=repetition_factor
-                )
+                arpeggio_cycle_pattern = pattern_cache.get(current_root_midi)
+                if arpeggio_cycle_pattern is None:
+                    arpeggio_cycle_pattern = create_arpeggio(
+                        current_root_midi, mode, arp_steps, min_octave, max_octave, 
+                        arp_mode, range_octaves, use_chord_tones=use_chord_tones,
+                        evolution_rate=evolution_rate, repetition_factor=repetition_factor,
+                        rng=rng
+                    )
+                    if deterministic_pattern:
+                        pattern_cache[current_root_midi] = arpeggio_cycle_pattern
                 
                 if not arpeggio_cycle_pattern:
                     continue
                     
-                # For each bar in this segment
-                for _ in range(num_bars_for_segment):
-                    # Repeat the pattern if needed
-                    for _ in range(repeats_per_bar):
-                        # For each note in the pattern
-                        for note in arpeggio_cycle_pattern:
-                            if arp_steps == 16 or repeat_pattern:
-                                # When using 16th notes, just add the note
-                                final_event_list.append(note)
-                            else:
-                                # When using longer notes, add None values after each note
-                                final_event_list.append(note)  # The note itself
-                                final_event_list.extend([None] * (steps_per_note - 1))  # Fill remaining steps with None
+                # Expand the cycle into one bar of 16th-note steps
+                if steps_per_note == 1:
+                    # When using 16th notes, just repeat the pattern
+                    one_bar = arpeggio_cycle_pattern * repeats_per_bar
+                else:
+                    # When using longer notes, hold each note with None steps after it
+                    one_bar = [None] * (len(arpeggio_cycle_pattern) * steps_per_note)
+                    one_bar[::steps_per_note] = arpeggio_cycle_pattern
+                
+                # Tile the bar across every bar in this segment
+                final_event_list.extend(one_bar * num_bars_for_segment)
 
         # Ensure total length matches bars * steps_per_bar
         total_expected_steps = bars * steps_per_bar
         if len(final_event_list) > total_expected_steps:
-            final_event_list = final_event_list[:total_expected_steps]
+            # Drop the overshoot in place rather than copying the kept part
+            del final_event_list[total_expected_steps:]
         elif len(final_event_list) < total_expected_steps:
             # Pad with None if too short
             final_event_list.extend([None] * (total_expected_steps - len(final_event_list)))
@@ -131,28 +178,26 @@ def create_arp(options: Dict):
         # Call drone generation function
         # This function must return List[Tuple[note, start_tick, duration_tick, velocity]]
         # Pass relevant options and the processed MIDI root notes
-        drone_options = options.copy()
-        final_event_list = generate_drone_events(drone_options, processed_root_notes_midi)
-        print(f"[INFO] Drone generation selected. {len(final_event_list)} drone events generated.")
+        drone_options = DroneOptions.from_options(options)
+        final_event_list = generate_drone_events(drone_options, processed_root_notes_midi, rng=rng)
+        logger.info("Drone generation selected. %d drone events generated.", len(final_event_list))
 
     # --- Filename and MIDI file creation --- 
-    root_notes_names_for_file = '-'.join([note_to_name(note) for note in processed_root_notes_midi]) if processed_root_notes_midi else str(root)
-    base_filename = f"{generation_type}_{mode}_{root_notes_names_for_file}"
+    root_notes_names_for_file = '-'.join(map(note_to_name, processed_root_notes_midi)) if processed_root_notes_midi else str(root)
+    file_name = "_".join((generation_type, mode, root_notes_names_for_file)) + ".mid"
     
-    output_folder = "generated"
-    current_script_dir = os.path.dirname(os.path.abspath(__file__))
-    output_path = os.path.join(current_script_dir, output_folder)
-    if not os.path.exists(output_path):
-        os.makedirs(output_path)
-    file_path = os.path.join(output_path, f"{base_filename}.mid")
+    os.makedirs(OUTPUT_PATH, exist_ok=True)
+    file_path = os.path.join(OUTPUT_PATH, file_name)
     options['filename'] = file_path
     
     # Create the MIDI file using the master event list
     result_filename = create_midi_file(final_event_list, options, active_effects)
-    print(f"\nMIDI file '{result_filename}' created with the following settings:")
-    print(f"  Generation Type: {generation_type}")
-    print(f"  Mode: {mode}")
-    print(f"  Root Notes: {root_notes_names_for_file}")
-    print(f"  Active Effects: {[type(effect).__name__ for effect in active_effects]}")
+    sys.stdout.write("\n".join((
+        f"\nMIDI file '{result_filename}' created with the following settings:",
+        f"  Generation Type: {generation_type}",
+        f"  Mode: {mode}",
+        f"  Root Notes: {root_notes_names_for_file}",
+        f"  Active Effects: {[type(effect).__name__ for effect in active_effects]}",
+    )) + "\n")
 
     return result_filename
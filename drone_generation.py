@@ -1,9 +1,14 @@
-import random # Added for future, more varied interest
-from typing import Dict, List, Tuple, Optional
-from .scale import get_scale # To get chord tones
+import logging
+import random
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+from .scale import get_scale_tuple # To get chord tones
+from .midi_types import DEFAULT_TICKS_PER_BEAT, MidiEvent
+from .options import FromOptionsMixin
 
-# Type alias for structured MIDI events, ensure it matches midi.py if ever moved to a common types file
-MidiEvent = Tuple[int, int, int, int] # (note, start_tick, duration_tick, velocity)
+logger = logging.getLogger(__name__)
 
 # New option for controlling drone interest
 DEFAULT_DRONE_VARIATION_INTERVAL_BARS = 1 # How often the drone voicing can change
@@ -16,45 +21,118 @@ DEFAULT_DRONE_WALKDOWN_NUM_STEPS = 2
 DEFAULT_DRONE_WALKDOWN_STEP_TICKS = 240 # Defaulted to Eighth note, updated from __main__.py change
 DEFAULT_MINIMUM_TARGET_SUSTAIN_TICKS_FOR_WALKDOWN = 60 # Min duration for the target note after walkdown
 
-def generate_drone_events(options: Dict, processed_root_notes_midi: List[int]) -> List[MidiEvent]:
+TICKS_PER_BAR = DEFAULT_TICKS_PER_BEAT * 4 # 4/4 time
+
+@dataclass(frozen=True)
+class DroneOptions(FromOptionsMixin):
+    """Drone generation settings, read once from the CLI options dict."""
+    bpm: int = 120
+    bars: int = 16
+    mode: str = 'major'
+    min_octave: int = 3
+    max_octave: int = 5
+    drone_base_velocity: int = 70
+    drone_variation_interval_bars: int = DEFAULT_DRONE_VARIATION_INTERVAL_BARS
+    drone_min_notes_held: int = DEFAULT_DRONE_MIN_NOTES_HELD
+    drone_octave_doubling_chance: float = DEFAULT_DRONE_OCTAVE_DOUBLING_CHANCE
+    drone_allow_octave_shifts: bool = DEFAULT_DRONE_ALLOW_OCTAVE_SHIFTS
+    drone_octave_shift_one_note_chance: float = DEFAULT_DRONE_OCTAVE_SHIFT_CHANCE
+    drone_enable_walkdowns: bool = DEFAULT_DRONE_ENABLE_WALKDOWNS
+    drone_walkdown_num_steps: int = DEFAULT_DRONE_WALKDOWN_NUM_STEPS
+    drone_walkdown_step_ticks: int = DEFAULT_DRONE_WALKDOWN_STEP_TICKS
+    min_target_sustain_ticks_for_walkdown: int = DEFAULT_MINIMUM_TARGET_SUSTAIN_TICKS_FOR_WALKDOWN
+
+@lru_cache(maxsize=256)
+def _base_chord_notes(root_pitch_class: int, mode: str, min_octave: int) -> Tuple[int, ...]:
+    """Sorted chord tones of the root placed in min_octave, clamped to the MIDI range."""
+    octave_offset = min_octave * 12
+    return tuple(sorted({
+        max(0, min(127, pc + octave_offset))
+        for pc in get_scale_tuple(root_pitch_class, mode, use_chord_tones=True)
+    }))
+
+@lru_cache(maxsize=256)
+def _diatonic_notes_in_range(root_pitch_class: int, mode: str, min_octave: int, max_octave: int) -> Tuple[int, ...]:
+    """Sorted scale notes from one octave below min_octave to one above max_octave, for walkdowns."""
+    octave_span_for_scale = range(min_octave - 1, max_octave + 2) # e.g. if min=3,max=5 -> octaves 2,3,4,5,6
+    octave_offsets = [oct_num * 12 for oct_num in octave_span_for_scale]
+    scale_notes = {
+        pc + octave_offset
+        for pc in get_scale_tuple(root_pitch_class, mode, use_chord_tones=False)
+        for octave_offset in octave_offsets
+    }
+    return tuple(sorted(note for note in scale_notes if 0 <= note <= 127))
+
+# Chord-note indices held at each position of the 4-interval variation pattern:
+# the full chord, root + 5th-like top note, the full chord, root + 3rd-like note. None holds the whole chord.
+_DRONE_PATTERN_INDICES = (None, (0, -1), None, (0, 1))
+
+def _interval_base_voicing(base_chord_notes: Sequence[int], pattern_idx: int, min_notes_held: int) -> List[int]:
+    """Sorted notes held for one variation interval at the given position of the 4-interval pattern."""
+    num_chord_notes = len(base_chord_notes)
+    pattern_indices = _DRONE_PATTERN_INDICES[pattern_idx & 3]
+    if num_chord_notes < 3 or num_chord_notes < min_notes_held or pattern_indices is None:
+        current_interval_base_notes = list(base_chord_notes)
+    else:
+        current_interval_base_notes = [base_chord_notes[i] for i in pattern_indices]
+    current_interval_base_notes = sorted(list(set(current_interval_base_notes)))
+    if len(current_interval_base_notes) < min_notes_held and num_chord_notes >= min_notes_held:
+        needed = min_notes_held - len(current_interval_base_notes)
+        potential_adds = [n for n in base_chord_notes if n not in current_interval_base_notes]
+        current_interval_base_notes.extend(potential_adds[:needed])
+        current_interval_base_notes = sorted(list(set(current_interval_base_notes)))
+    return current_interval_base_notes
+
+def generate_drone_events(opts: DroneOptions, processed_root_notes_midi: List[int], rng: Optional[random.Random] = None) -> List[MidiEvent]:
     """
     Generates drone events with dynamic voicing, octave doubling/shifts, and DIATONIC melodic walkdowns.
+    Randomness is drawn from `rng`, or from the module-level `random` state if none is given.
     """
-    bpm = options.get('bpm', 120)
-    total_bars = options.get('bars', 16)
-    mode = options.get('mode', 'major')
-    min_octave_param = options.get('min_octave', 3)
-    max_octave_param = options.get('max_octave', 5)
-    base_velocity = options.get('drone_base_velocity', 70)
+    if rng is None:
+        rng = random  # Module-level functions share the Random interface
+
+    # Bind every setting to a local once; they are read repeatedly in the interval loops below
+    total_bars = opts.bars
+    mode = opts.mode
+    min_octave_param = opts.min_octave
+    max_octave_param = opts.max_octave
+    base_velocity = opts.drone_base_velocity
     
-    variation_interval_bars = options.get('drone_variation_interval_bars', DEFAULT_DRONE_VARIATION_INTERVAL_BARS)
-    min_notes_held = options.get('drone_min_notes_held', DEFAULT_DRONE_MIN_NOTES_HELD)
-    octave_doubling_chance = options.get('drone_octave_doubling_chance', DEFAULT_DRONE_OCTAVE_DOUBLING_CHANCE)
-    allow_octave_shifts = options.get('drone_allow_octave_shifts', DEFAULT_DRONE_ALLOW_OCTAVE_SHIFTS)
-    octave_shift_one_note_chance = options.get('drone_octave_shift_one_note_chance', DEFAULT_DRONE_OCTAVE_SHIFT_CHANCE)
-    enable_walkdowns = options.get('drone_enable_walkdowns', DEFAULT_DRONE_ENABLE_WALKDOWNS)
-    walkdown_num_steps_config = options.get('drone_walkdown_num_steps', DEFAULT_DRONE_WALKDOWN_NUM_STEPS)
-    walkdown_step_ticks_config = options.get('drone_walkdown_step_ticks', DEFAULT_DRONE_WALKDOWN_STEP_TICKS)
-    min_target_sustain_ticks = options.get('min_target_sustain_ticks_for_walkdown', DEFAULT_MINIMUM_TARGET_SUSTAIN_TICKS_FOR_WALKDOWN)
-
-    ticks_per_beat = 480
-    ticks_per_bar = ticks_per_beat * 4
+    variation_interval_bars = opts.drone_variation_interval_bars
+    min_notes_held = opts.drone_min_notes_held
+    octave_doubling_chance = opts.drone_octave_doubling_chance
+    allow_octave_shifts = opts.drone_allow_octave_shifts
+    octave_shift_one_note_chance = opts.drone_octave_shift_one_note_chance
+    enable_walkdowns = opts.drone_enable_walkdowns
+    walkdown_num_steps_config = opts.drone_walkdown_num_steps
+    walkdown_step_ticks_config = opts.drone_walkdown_step_ticks
+    min_target_sustain_ticks = opts.min_target_sustain_ticks_for_walkdown
+
+    ticks_per_bar = TICKS_PER_BAR
     variation_interval_ticks = variation_interval_bars * ticks_per_bar
 
+    # Octave bounds in MIDI note numbers, used by the fallback chord and the shift/doubling range checks
+    octave_offset = min_octave_param * 12
+    shift_upper_bound = (max_octave_param + 1) * 12
+    doubling_upper_bound = (max_octave_param + 2) * 12
+
     final_drone_events: List[MidiEvent] = []
     global_current_tick = 0 # Tracks the absolute start tick for events across segments
 
     if not processed_root_notes_midi:
         # Fallback for no root notes (unchanged)
         c3_midi = 48 
-        drone_chord_notes_pc = get_scale(c3_midi, 'major', use_chord_tones=True) 
-        drone_chord_notes_abs = [pc + (min_octave_param * 12) for pc in drone_chord_notes_pc]
-        drone_chord_notes_abs = [max(0, min(127, note)) for note in drone_chord_notes_abs]
+        drone_chord_notes_pc = get_scale_tuple(c3_midi, 'major', use_chord_tones=True)
+        drone_chord_notes_abs = [max(0, min(127, pc + octave_offset)) for pc in drone_chord_notes_pc]
         total_duration_ticks = total_bars * ticks_per_bar
         for note in drone_chord_notes_abs:
-            final_drone_events.append((note, 0, total_duration_ticks, base_velocity))
+            final_drone_events.append(MidiEvent(note, 0, total_duration_ticks, base_velocity))
         return final_drone_events
 
+    # The number of events depends on random doublings and walkdowns, so the list grows as it goes;
+    # bind its append once since it runs for every held note
+    add_event = final_drone_events.append
+
     num_root_notes = len(processed_root_notes_midi)
     bars_per_segment = total_bars // num_root_notes if num_root_notes > 0 else total_bars
 
@@ -69,30 +147,23 @@ def generate_drone_events(options: Dict, processed_root_notes_midi: List[int]) -
         segment_start_tick = global_current_tick
         segment_duration_ticks = segment_duration_bars * ticks_per_bar
 
-        chord_tone_pitch_classes = get_scale(root_midi_note, mode, use_chord_tones=True)
-        
-        base_chord_notes = sorted(list(set([
-            max(0, min(127, pc + (min_octave_param * 12))) for pc in chord_tone_pitch_classes
-        ])))
+        # Chord and scale note sets only depend on the root's pitch class, so they are cached across segments
+        root_pitch_class = root_midi_note % 12
+        base_chord_notes = _base_chord_notes(root_pitch_class, mode, min_octave_param)
         if not base_chord_notes: # Fallback
             base_chord_notes = [max(0,min(127, root_midi_note))] 
         
         num_chord_notes = len(base_chord_notes)
         if num_chord_notes == 0: continue # Should not happen if fallback works
 
-        print(f"[DRONE DEBUG] Root: {root_midi_note}, Mode: {mode}, Base Chord: {base_chord_notes}, Segment Bars: {segment_duration_bars}")
+        logger.debug("Root: %s, Mode: %s, Base Chord: %s, Segment Bars: %s",
+                     root_midi_note, mode, base_chord_notes, segment_duration_bars)
 
         # Get full scale notes in a relevant range for diatonic walkdowns
-        full_scale_pitch_classes = get_scale(root_midi_note, mode, use_chord_tones=False)
-        diatonic_notes_in_range: List[int] = []
-        # Generate notes for a few octaves around min_octave_param to ensure coverage for walkdowns
-        octave_span_for_scale = range(min_octave_param -1, max_octave_param + 2) # e.g. if min=3,max=5 -> octaves 2,3,4,5,6
-        for pc in full_scale_pitch_classes:
-            for oct_num in octave_span_for_scale:
-                note_val = pc + (oct_num * 12)
-                if 0 <= note_val <= 127:
-                    diatonic_notes_in_range.append(note_val)
-        diatonic_notes_in_range = sorted(list(set(diatonic_notes_in_range)))
+        diatonic_notes_in_range = _diatonic_notes_in_range(root_pitch_class, mode, min_octave_param, max_octave_param)
+
+        # The base voicing only depends on the pattern position, so build the four of them once per segment
+        interval_voicings = [_interval_base_voicing(base_chord_notes, pattern_idx, min_notes_held) for pattern_idx in range(4)]
 
         # Iterate through variation intervals within this segment
         current_segment_tick_offset = 0
@@ -103,21 +174,7 @@ def generate_drone_events(options: Dict, processed_root_notes_midi: List[int]) -
             if interval_actual_duration_ticks <= 0: break
 
             interval_start_abs_tick = global_current_tick + current_segment_tick_offset
-            current_interval_base_notes = []
-            if num_chord_notes < 3 or num_chord_notes < min_notes_held:
-                current_interval_base_notes = list(base_chord_notes)
-            else:
-                current_interval_base_notes.append(base_chord_notes[0]) # Root
-                pattern_idx = variation_pattern_counter % 4
-                if pattern_idx == 0 or pattern_idx == 2: current_interval_base_notes.extend(base_chord_notes[1:])
-                elif pattern_idx == 1 and num_chord_notes > 1: current_interval_base_notes.append(base_chord_notes[num_chord_notes-1]) # 5th-like
-                elif pattern_idx == 3 and num_chord_notes > 1: current_interval_base_notes.append(base_chord_notes[1]) # 3rd-like
-            current_interval_base_notes = sorted(list(set(current_interval_base_notes)))
-            if len(current_interval_base_notes) < min_notes_held and num_chord_notes >= min_notes_held:
-                needed = min_notes_held - len(current_interval_base_notes)
-                potential_adds = [n for n in base_chord_notes if n not in current_interval_base_notes]
-                current_interval_base_notes.extend(potential_adds[:needed])
-                current_interval_base_notes = sorted(list(set(current_interval_base_notes)))
+            current_interval_base_notes = interval_voicings[variation_pattern_counter % 4]
 
             # 2. Apply octave shift to one note (if enabled) from the base voicing
             notes_for_direct_play_and_doubling_source = list(current_interval_base_notes)
@@ -125,13 +182,13 @@ def generate_drone_events(options: Dict, processed_root_notes_midi: List[int]) -
             if allow_octave_shifts:
                 # Create a list of indices to shuffle for randomizing which note gets shifted
                 indices_to_try_shift = list(range(len(notes_for_direct_play_and_doubling_source)))
-                random.shuffle(indices_to_try_shift)
+                rng.shuffle(indices_to_try_shift)
                 for i in indices_to_try_shift:
                     note_to_potentially_shift = notes_for_direct_play_and_doubling_source[i]
-                    if random.random() < octave_shift_one_note_chance: # Apply overall chance here too
-                        direction = random.choice([-12, 12])
+                    if rng.random() < octave_shift_one_note_chance: # Apply overall chance here too
+                        direction = rng.choice([-12, 12])
                         shifted_note = note_to_potentially_shift + direction
-                        if min_octave_param * 12 <= shifted_note < (max_octave_param + 1) * 12 and 0 <= shifted_note <= 127:
+                        if octave_offset <= shifted_note < shift_upper_bound and 0 <= shifted_note <= 127:
                             notes_for_direct_play_and_doubling_source[i] = shifted_note
                             shifted_one_note_this_interval = True
                             break # Only shift one note per interval
@@ -139,75 +196,62 @@ def generate_drone_events(options: Dict, processed_root_notes_midi: List[int]) -
 
             # 3. Add events for these (potentially shifted) main notes
             for main_note in notes_for_direct_play_and_doubling_source:
-                final_drone_events.append((main_note, interval_start_abs_tick, interval_actual_duration_ticks, base_velocity))
+                add_event(MidiEvent(main_note, interval_start_abs_tick, interval_actual_duration_ticks, base_velocity))
             
             # 4. Process octave doubling (max one per interval, with walkdowns) for each of these main notes
             has_doubled_a_note_this_interval = False
             shuffled_sources_for_doubling = list(notes_for_direct_play_and_doubling_source) # Create a copy to shuffle
-            random.shuffle(shuffled_sources_for_doubling)
+            rng.shuffle(shuffled_sources_for_doubling)
 
             for note_being_doubled_source in shuffled_sources_for_doubling: 
-                if not has_doubled_a_note_this_interval and random.random() < octave_doubling_chance:
-                    direction = random.choice([-12, 12])
+                if not has_doubled_a_note_this_interval and rng.random() < octave_doubling_chance:
+                    direction = rng.choice([-12, 12])
                     doubled_note_target = note_being_doubled_source + direction
                     doubled_note_target = max(0, min(127, doubled_note_target))
-                    if not (min_octave_param * 12 <= doubled_note_target < (max_octave_param + 2) * 12):
+                    if not (octave_offset <= doubled_note_target < doubling_upper_bound):
                         continue 
-                    actual_walk_notes_to_play: List[int] = [] # Initialize to empty list
+                    actual_walk_notes_to_play: Sequence[int] = () # Initialize to empty; a slice of the cached scale tuple when walking
                     actual_total_walkdown_duration = 0
                     
                     if enable_walkdowns and walkdown_num_steps_config > 0 and walkdown_step_ticks_config > 0:
                         potential_total_walkdown_duration = walkdown_num_steps_config * walkdown_step_ticks_config
                         if interval_actual_duration_ticks >= potential_total_walkdown_duration + min_target_sustain_ticks:
-                            # Try to build diatonic walk sequence (simplified)
-                            temp_walk_notes = []
-                            for step_index_from_target in range(walkdown_num_steps_config, 0, -1): # e.g., 2, 1 for 2 steps
-                                found_step_note: Optional[int] = None
-                                if doubled_note_target > note_being_doubled_source: # Doubled upwards, walk from below
-                                    # Find the Nth diatonic note below doubled_note_target
-                                    notes_below = [n for n in diatonic_notes_in_range if n < doubled_note_target]
-                                    if len(notes_below) >= step_index_from_target:
-                                        found_step_note = notes_below[-step_index_from_target] # Nth from end of sorted list of notes below
-                                else: # Doubled downwards, walk from above
-                                    # Find the Nth diatonic note above doubled_note_target
-                                    notes_above = [n for n in diatonic_notes_in_range if n > doubled_note_target]
-                                    if len(notes_above) >= step_index_from_target:
-                                        found_step_note = notes_above[step_index_from_target - 1] # Nth from beginning of sorted list of notes above
-                                
-                                if found_step_note is not None:
-                                    if not temp_walk_notes or found_step_note != temp_walk_notes[-1]: # Avoid duplicate sequential notes
-                                        temp_walk_notes.append(found_step_note)
-                                else:
-                                    # Optional: could fallback to chromatic if diatonic step not found, or just make walk shorter
-                                    pass # Step not found, walk will be shorter
-                            
-                            actual_walk_notes_to_play = temp_walk_notes
+                            # Build the diatonic walk by slicing the sorted scale around the target
+                            if doubled_note_target > note_being_doubled_source: # Doubled upwards, walk from below
+                                # The N diatonic notes just below doubled_note_target, ascending
+                                target_pos = bisect_left(diatonic_notes_in_range, doubled_note_target)
+                                actual_walk_notes_to_play = diatonic_notes_in_range[max(0, target_pos - walkdown_num_steps_config):target_pos]
+                            else: # Doubled downwards, walk from above
+                                # The N diatonic notes just above doubled_note_target, descending
+                                target_pos = bisect_right(diatonic_notes_in_range, doubled_note_target)
+                                actual_walk_notes_to_play = diatonic_notes_in_range[target_pos:target_pos + walkdown_num_steps_config][::-1]
+                            # If the scale runs out before N steps, the walk is simply shorter
                             actual_total_walkdown_duration = len(actual_walk_notes_to_play) * walkdown_step_ticks_config
                         
-                        # Add walkdown notes if any were generated
-                        current_walk_event_tick_offset = 0
-                        for walk_note in actual_walk_notes_to_play: # Will be empty if walkdown failed or disabled
-                            final_drone_events.append((
-                                walk_note, 
-                                interval_start_abs_tick + current_walk_event_tick_offset, 
-                                walkdown_step_ticks_config, 
+                        # Add walkdown notes if any were generated (empty if walkdown failed or disabled)
+                        final_drone_events.extend(
+                            MidiEvent(
+                                walk_note,
+                                interval_start_abs_tick + step * walkdown_step_ticks_config,
+                                walkdown_step_ticks_config,
                                 base_velocity - 15 # Softer walk notes
-                            ))
-                            current_walk_event_tick_offset += walkdown_step_ticks_config
+                            )
+                            for step, walk_note in enumerate(actual_walk_notes_to_play)
+                        )
                         
                         # Add the target doubled note (with adjusted start/duration if walkdown occurred)
                         target_note_start_tick = interval_start_abs_tick + actual_total_walkdown_duration
                         target_note_duration = interval_actual_duration_ticks - actual_total_walkdown_duration
                         
                         if target_note_duration >= min_target_sustain_ticks: # Ensure target note has some sound
-                            final_drone_events.append((
+                            add_event(MidiEvent(
                                 doubled_note_target, 
                                 target_note_start_tick, 
                                 target_note_duration, 
                                 base_velocity
                             ))
                         elif not actual_walk_notes_to_play: # No walkdown, but target note itself is too short, play for full interval
-                            final_drone_events.append((
+                            add_event(MidiEvent(
                                 doubled_note_target, 
                                 interval_start_abs_tick, 
                                 interval_actual_duration_ticks, 
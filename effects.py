@@ -2,10 +2,11 @@
 MIDI effect implementations.
 """
 
+import logging
 import random
 import math
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Union, cast, Tuple
+from typing import Callable, List, Optional, Dict, Union, cast, Tuple
 from .effects_base import (
     MidiEffect, NoteContext, EffectConfiguration, EffectType,
     create_note_context, convert_legacy_to_instructions
@@ -19,32 +20,31 @@ from .midi_types import (
     MIN_TIME_BETWEEN_BENDS_MS
 )
 
+logger = logging.getLogger(__name__)
+
+# Factories build an effect from its configuration dict and an optional random generator
+EffectFactory = Callable[[Dict, Optional[random.Random]], MidiEffect]
+
 class EffectRegistry:
     """Registry for MIDI effects."""
     
+    _factories: Dict[str, EffectFactory] = {}
+    
     @classmethod
-    def create_effect(cls, effect_conf: Dict) -> Optional[MidiEffect]:
-        """Create an effect from configuration."""
-        effect_name = effect_conf.get('name', '')
-        
-        if effect_name == 'tape_wobble':
-            config = TapeWobbleConfiguration(
-                bend_up_cents=effect_conf.get('wow_depth', DEFAULT_BEND_UP_CENTS),
-                bend_down_cents=effect_conf.get('wow_depth', DEFAULT_BEND_DOWN_CENTS),
-                randomness=effect_conf.get('randomness', DEFAULT_RANDOMNESS),
-                depth_units=effect_conf.get('depth_units', 'cents'),
-                pitch_bend_update_rate=effect_conf.get('flutter_rate_hz', DEFAULT_PITCH_BEND_UPDATE_RATE)
-            )
-            return TapeWobbleEffect(config)
-            
-        elif effect_name == 'humanize_velocity':
-            config = HumanizeVelocityConfiguration(
-                humanization_range=effect_conf.get('humanization_range', DEFAULT_HUMANIZE_RANGE)
-            )
-            return HumanizeVelocityEffect(config)
-
-            
-        return None
+    def register(cls, effect_name: str) -> Callable[[EffectFactory], EffectFactory]:
+        """Decorator registering a factory that builds an effect from its configuration dict and random generator."""
+        def decorator(factory: EffectFactory) -> EffectFactory:
+            cls._factories[effect_name] = factory
+            return factory
+        return decorator
+    
+    @classmethod
+    def create_effect(cls, effect_conf: Dict, rng: Optional[random.Random] = None) -> Optional[MidiEffect]:
+        """Create an effect from configuration, drawing its randomness from `rng` (module-level `random` if None)."""
+        factory = cls._factories.get(effect_conf.get('name', ''))
+        if factory is None:
+            return None
+        return factory(effect_conf, rng)
 
 # Constants for tape wobble effect
 SEMITONES_PER_BEND = 2.0  # Standard pitch bend range
@@ -60,6 +60,7 @@ DEFAULT_PITCH_BEND_UPDATE_RATE = 30.0
 
 # Default values for humanize velocity configuration
 DEFAULT_HUMANIZE_RANGE = 10
+MAX_HUMANIZE_RANGE = 64 # Keeps base_velocity ± range/2 + downbeat emphasis inside 1..127 with headroom
 
 @dataclass
 class HumanizeVelocityConfiguration(EffectConfiguration):
@@ -115,20 +116,17 @@ class TapeWobbleConfiguration(EffectConfiguration):
         if self.pitch_bend_update_rate <= 0:
             raise ValueError("pitch_bend_update_rate must be positive")
 
-# Legacy type for backward compatibility
-MidiEvent = tuple[int, int, int, int]  # (note, start_tick, duration_tick, velocity)
-
 # --- Tape Wobble Generation Function ---
-def tape_wobble(options: dict) -> List[tuple[float, int]]:
+def tape_wobble(options: dict, rng: Optional[random.Random] = None) -> List[tuple[float, int]]:
     """
     Generates a simulated "tape wobble" modulation signal over time.
+    Random phase offsets are drawn from `rng`, or the module-level `random` state if None.
     
     Returns:
         List of tuples (time_sec, bend_value) where:
         - time_sec: The time in seconds when this bend value should be applied
         - bend_value: The MIDI pitch bend value (-8192 to 8191)
     """
-    print("\n=== Tape Wobble Generation Debug ===")
     duration = options.get('duration_sec', 5.0)
     wow_rate = options.get('wow_rate_hz', DEFAULT_WOW_RATE_HZ)
     wow_depth = options.get('wow_depth', DEFAULT_WOW_DEPTH)
@@ -137,12 +135,9 @@ def tape_wobble(options: dict) -> List[tuple[float, int]]:
     randomness = options.get('randomness', DEFAULT_RANDOMNESS)
     depth_units = options.get('depth_units', 'cents')
     
-    print(f"Parameters:")
-    print(f"  Duration: {duration:.2f} sec")
-    print(f"  Wow Rate: {wow_rate:.2f} Hz, Depth: {wow_depth:.2f}")
-    print(f"  Flutter Rate: {flutter_rate:.2f} Hz, Depth: {flutter_depth:.2f}")
-    print(f"  Randomness: {randomness:.2f}")
-    print(f"  Depth Units: {depth_units}")
+    logger.debug("Tape wobble parameters: duration %.2f sec, wow %.2f Hz depth %.2f, "
+                 "flutter %.2f Hz depth %.2f, randomness %.2f, depth units %s",
+                 duration, wow_rate, wow_depth, flutter_rate, flutter_depth, randomness, depth_units)
     
     # Calculate optimal sample rate
     nyquist_factor = 4.0
@@ -152,10 +147,10 @@ def tape_wobble(options: dict) -> List[tuple[float, int]]:
         DEFAULT_PITCH_BEND_UPDATE_RATE
     )
     sample_rate_hz = min(50, max(10, int(min_sample_rate)))
-    print(f"Calculated sample rate: {sample_rate_hz} Hz")
+    logger.debug("Calculated sample rate: %d Hz", sample_rate_hz)
     
     if duration <= 0:
-        print("Duration <= 0, returning empty list")
+        logger.debug("Duration <= 0, returning empty list")
         return []
 
     num_samples = int(duration * sample_rate_hz)
@@ -165,28 +160,33 @@ def tape_wobble(options: dict) -> List[tuple[float, int]]:
 
     # Initialize phase offsets
     clamped_randomness = max(0.0, min(1.0, randomness))
-    wow_phase = random.random() * 2 * math.pi * clamped_randomness
-    flutter_phase = random.random() * 2 * math.pi * clamped_randomness
+    if rng is None:
+        rng = random  # Module-level functions share the Random interface
+    wow_phase = rng.random() * 2 * math.pi * clamped_randomness
+    flutter_phase = rng.random() * 2 * math.pi * clamped_randomness
     
-    print(f"\nInitial phases:")
-    print(f"  Wow Phase: {wow_phase:.2f} rad")
-    print(f"  Flutter Phase: {flutter_phase:.2f} rad")
+    logger.debug("Initial phases: wow %.2f rad, flutter %.2f rad", wow_phase, flutter_phase)
     
     # Always emit initial center value
     wobble_data.append((0.0, 0))
-    print("\nStarting wobble generation...")
+    debug = logger.isEnabledFor(logging.DEBUG)
 
     # Debug counters
     total_values = 0
     emitted_values = 0
 
+    # Angular frequencies are loop invariant
+    wow_omega = 2 * math.pi * wow_rate
+    flutter_omega = 2 * math.pi * flutter_rate
+    sin = math.sin
+
     for i in range(num_samples):
         total_values += 1
         t = i / sample_rate_hz
         
         # Calculate components
-        wow = wow_depth * math.sin(2 * math.pi * wow_rate * t + wow_phase)
-        flutter = flutter_depth * math.sin(2 * math.pi * flutter_rate * t + flutter_phase)
+        wow = wow_depth * sin(wow_omega * t + wow_phase)
+        flutter = flutter_depth * sin(flutter_omega * t + flutter_phase)
         total_mod = wow + flutter
 
         # Convert to pitch bend value
@@ -209,15 +209,13 @@ def tape_wobble(options: dict) -> List[tuple[float, int]]:
             last_emission_time = t
             emitted_values += 1
             
-            if emitted_values <= 5 or emitted_values % 50 == 0:  # Print first 5 and every 50th after
-                print(f"t={t:.3f}s: wow={wow:.2f}, flutter={flutter:.2f}, total={total_mod:.2f}, "
-                      f"semitones={semitones:.3f}, bend={bend_value}")
+            if debug and (emitted_values <= 5 or emitted_values % 50 == 0):  # Log first 5 and every 50th after
+                logger.debug("t=%.3fs: wow=%.2f, flutter=%.2f, total=%.2f, semitones=%.3f, bend=%d",
+                             t, wow, flutter, total_mod, semitones, bend_value)
 
-    print(f"\nWobble generation complete:")
-    print(f"Total values calculated: {total_values}")
-    print(f"Values emitted: {emitted_values}")
-    print(f"Compression ratio: {total_values/emitted_values:.1f}:1")
-    print("=====================================\n")
+    if debug:
+        logger.debug("Wobble generation complete: %d values calculated, %d emitted (%.1f:1)",
+                     total_values, emitted_values, total_values / max(1, emitted_values))
     return wobble_data
 
 
@@ -228,10 +226,11 @@ class TapeWobbleEffect(MidiEffect):
     This is a sequence-level processor that generates MIDI pitch bend messages.
     """
     
-    def __init__(self, config: Optional[TapeWobbleConfiguration] = None):
-        """Initialize with optional configuration."""
+    def __init__(self, config: Optional[TapeWobbleConfiguration] = None, rng: Optional[random.Random] = None):
+        """Initialize with optional configuration and random generator (module-level `random` if None)."""
         super().__init__(config or TapeWobbleConfiguration())
         self.config = cast(TapeWobbleConfiguration, self.config)
+        self.rng = rng if rng is not None else random
         self.wobble_state = WobbleState()
     
     def _validate_configuration(self) -> None:
@@ -246,8 +245,6 @@ class TapeWobbleEffect(MidiEffect):
                              events: List[Union[MidiInstruction, Tuple]], 
                              options: Dict) -> List[MidiInstruction]:
         """Process the complete sequence, adding pitch bend messages for the wobble effect."""
-        print("\n=== TapeWobbleEffect Processing ===")
-        
         # Get sequence parameters
         bpm = options.get('bpm', 120)
         ticks_per_beat = options.get('ticks_per_beat', DEFAULT_TICKS_PER_BEAT)
@@ -274,9 +271,8 @@ class TapeWobbleEffect(MidiEffect):
         note_events.sort(key=lambda x: x[0])
         
         total_duration_seconds = (max_tick / ticks_per_beat) * (60.0 / bpm)
-        print(f"Sequence duration: {total_duration_seconds:.2f} seconds")
-        print(f"BPM: {bpm}, Ticks per beat: {ticks_per_beat}")
-        print(f"Found {len(note_events)} notes")
+        logger.debug("Sequence duration: %.2f seconds, BPM: %s, ticks per beat: %s, %d notes",
+                     total_duration_seconds, bpm, ticks_per_beat, len(note_events))
         
         # Generate wobble data based on note positions
         wobble_events = self._generate_wobble_events(
@@ -291,7 +287,6 @@ class TapeWobbleEffect(MidiEffect):
         midi_instructions: List[MidiInstruction] = []
         
         # Add RPN messages for pitch bend range
-        print("\nAdding RPN configuration messages...")
         midi_instructions.extend([
             ('control_change', 0, 101, 0, midi_channel),   # RPN MSB
             ('control_change', 0, 100, 0, midi_channel),   # RPN LSB
@@ -307,7 +302,6 @@ class TapeWobbleEffect(MidiEffect):
                 midi_instructions.append(event)
         
         # Add pitch bend events
-        print("\nAdding pitch bend messages...")
         for time_sec, bend_value in wobble_events:
             tick = int((time_sec * bpm * ticks_per_beat) / 60.0)
             midi_instructions.append(('pitch_bend', tick, bend_value, midi_channel))
@@ -326,18 +320,13 @@ class TapeWobbleEffect(MidiEffect):
         Each note alternates direction - if one note goes up, the next goes down.
         Returns list of (time_sec, bend_value) tuples.
         """
-        print("\nGenerating alternating note-synchronized wobble data...")
-        
         # Calculate musical time parameters
         beats_per_bar = 4  # Assuming 4/4 time
         seconds_per_beat = 60.0 / bpm
         seconds_per_bar = seconds_per_beat * beats_per_bar
         total_bars = duration_sec / seconds_per_bar
         
-        print(f"Musical timing:")
-        print(f"  BPM: {bpm}")
-        print(f"  Total bars: {total_bars:.2f}")
-        print(f"  Seconds per bar: {seconds_per_bar:.2f}")
+        logger.debug("Musical timing: BPM %s, %.2f bars, %.2f seconds per bar", bpm, total_bars, seconds_per_bar)
         
         # Calculate note timings in seconds
         note_times = [(tick / ticks_per_beat * seconds_per_beat, note) 
@@ -347,8 +336,8 @@ class TapeWobbleEffect(MidiEffect):
             note_times = [(0, 60)]  # Default note if no notes found
         
         # Randomly determine initial direction
-        first_note_up = random.choice([True, False])
-        print(f"\nInitial direction: {'UP' if first_note_up else 'DOWN'}")
+        first_note_up = self.rng.choice([True, False])
+        logger.debug("Initial direction: %s", 'UP' if first_note_up else 'DOWN')
         
         # Calculate optimal sample rate
         sample_rate_hz = self.config.pitch_bend_update_rate
@@ -360,32 +349,35 @@ class TapeWobbleEffect(MidiEffect):
         
         # Add initial center point
         wobble_data.append((0.0, 0))
-        print("\nGenerating pitch bend curve...")
         
         # Apply very slight random variation to max bend values
-        rand_factor = 1.0 + (random.random() - 0.5) * self.config.randomness
+        rand_factor = 1.0 + (self.rng.random() - 0.5) * self.config.randomness
         max_up_cents = self.config.bend_up_cents * rand_factor
-        rand_factor = 1.0 + (random.random() - 0.5) * self.config.randomness
+        rand_factor = 1.0 + (self.rng.random() - 0.5) * self.config.randomness
         max_down_cents = self.config.bend_down_cents * rand_factor
         
-        print(f"Maximum bend values (with randomness):")
-        print(f"  Up: {max_up_cents:.1f} cents")
-        print(f"  Down: {max_down_cents:.1f} cents")
-        
+        logger.debug("Maximum bend values (with randomness): up %.1f cents, down %.1f cents",
+                     max_up_cents, max_down_cents)
+
+        # Loop invariants: note start times, unit conversion and emission interval
+        note_start_times = [note_time for note_time, _ in note_times]
+        num_notes = len(note_start_times)
+        semitones_per_unit = 0.01 if self.config.depth_units == 'cents' else 1.0
+        bend_per_semitone = 8192 / SEMITONES_PER_BEND
+        min_emission_interval = MIN_TIME_BETWEEN_BENDS_MS / 1000.0
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        current_note_idx = 0
         for i in range(num_samples):
             t = i / sample_rate_hz
-            
-            # Find current note segment
-            current_note_idx = 0
-            for idx, (note_time, _) in enumerate(note_times[1:], 1):
-                if t >= note_time:
-                    current_note_idx = idx
-                else:
-                    break
-            
+
+            # Sample times only increase, so advance the note cursor instead of rescanning
+            while current_note_idx + 1 < num_notes and note_start_times[current_note_idx + 1] <= t:
+                current_note_idx += 1
+
             # Calculate position within note
-            note_start_time = note_times[current_note_idx][0]
-            note_end_time = note_times[current_note_idx + 1][0] if current_note_idx + 1 < len(note_times) else duration_sec
+            note_start_time = note_start_times[current_note_idx]
+            note_end_time = note_start_times[current_note_idx + 1] if current_note_idx + 1 < num_notes else duration_sec
             note_duration = note_end_time - note_start_time
             position_in_note = (t - note_start_time) / note_duration
             
@@ -401,32 +393,27 @@ class TapeWobbleEffect(MidiEffect):
             else:
                 bend_cents = -curve_position * max_down_cents
             
-            # Convert to pitch bend value
-            if self.config.depth_units == 'cents':
-                semitones = bend_cents / 100.0
-            else:
-                semitones = bend_cents
-            
-            # Calculate bend value ensuring it stays within MIDO's required range
-            bend_value = int(round((semitones / SEMITONES_PER_BEND) * 8192))
+            # Convert to pitch bend value, ensuring it stays within MIDO's required range
+            semitones = bend_cents * semitones_per_unit
+            bend_value = int(round(semitones * bend_per_semitone))
             bend_value = max(MIDI_PITCH_BEND_MIN, min(MIDI_PITCH_BEND_MAX, bend_value))
             
             # Determine if we should emit this value
             time_since_last = t - last_emission_time
             value_change = abs(bend_value - last_emitted_value)
             
-            if (time_since_last >= MIN_TIME_BETWEEN_BENDS_MS / 1000.0 and 
+            if (time_since_last >= min_emission_interval and 
                 (value_change >= PITCH_BEND_THRESHOLD or time_since_last >= 0.1)):
                 wobble_data.append((t, bend_value))
                 last_emitted_value = bend_value
                 last_emission_time = t
                 
                 # Log progress at key points
-                if position_in_note < 0.1 or len(wobble_data) <= 1:
-                    direction = "UP" if note_goes_up else "DOWN"
-                    print(f"Note {current_note_idx + 1} ({direction}): {bend_cents:+.1f} cents (bend: {bend_value:+d})")
+                if debug and (position_in_note < 0.1 or len(wobble_data) <= 1):
+                    logger.debug("Note %d (%s): %+.1f cents (bend: %+d)", current_note_idx + 1,
+                                 "UP" if note_goes_up else "DOWN", bend_cents, bend_value)
         
-        print(f"\nGenerated {len(wobble_data)} pitch bend points")
+        logger.debug("Generated %d pitch bend points", len(wobble_data))
         return wobble_data
 
 
@@ -442,10 +429,14 @@ class HumanizeVelocityEffect(MidiEffect):
     - Natural accent patterns
     """
     
-    def __init__(self, config: Optional[HumanizeVelocityConfiguration] = None):
-        """Initialize with optional configuration."""
+    def __init__(self, config: Optional[HumanizeVelocityConfiguration] = None, rng: Optional[random.Random] = None):
+        """Initialize with optional configuration and random generator (module-level `random` if None)."""
         super().__init__(config or HumanizeVelocityConfiguration())
         self.config = cast(HumanizeVelocityConfiguration, self.config)
+        self.rng = rng if rng is not None else random
+        # Variation bounds depend only on the configuration, so compute them once
+        self._variation_low = -self.config.humanization_range // 3
+        self._variation_high = self.config.humanization_range // 3
         self._reset_state()
     
     def _reset_state(self) -> None:
@@ -494,9 +485,9 @@ class HumanizeVelocityEffect(MidiEffect):
         """Update and return the current velocity trend influence."""
         if self.trend_remaining <= 0:
             # Consider starting new trend
-            if random.random() < self.config.trend_probability:
-                self.current_trend = random.choice([-1.0, 1.0]) * self.config.pattern_strength
-                self.trend_remaining = random.randint(3, 8)  # Trend length
+            if self.rng.random() < self.config.trend_probability:
+                self.current_trend = self.rng.choice([-1.0, 1.0]) * self.config.pattern_strength
+                self.trend_remaining = self.rng.randint(3, 8)  # Trend length
             else:
                 self.current_trend = None
         
@@ -522,10 +513,7 @@ class HumanizeVelocityEffect(MidiEffect):
         trend_influence = self._update_velocity_trend()
         
         # Calculate random variation (smaller range now that we have other influences)
-        random_variation = random.randint(
-            -self.config.humanization_range // 3,
-            self.config.humanization_range // 3
-        )
+        random_variation = self.rng.randint(self._variation_low, self._variation_high)
         
         # Combine all influences
         total_adjustment = (
@@ -541,14 +529,11 @@ class HumanizeVelocityEffect(MidiEffect):
         new_ctx['velocity'] = new_velocity
         
         # Debug output for significant changes or pattern events
-        if (abs(total_adjustment) > self.config.humanization_range // 3 or
+        if (abs(total_adjustment) > self._variation_high or
             position_emphasis != 0 or beat_emphasis != 0):
-            print(f"Note velocity adjusted: {base} -> {new_velocity} "
-                  f"(total: {total_adjustment:+d}, "
-                  f"pos: {position_emphasis:+d}, "
-                  f"beat: {beat_emphasis:+d}, "
-                  f"trend: {trend_influence:+d}, "
-                  f"random: {random_variation:+d})")
+            logger.debug("Note velocity adjusted: %d -> %d (total: %+d, pos: %+d, beat: %+d, trend: %+d, random: %+d)",
+                         base, new_velocity, total_adjustment, position_emphasis,
+                         beat_emphasis, trend_influence, random_variation)
         
         # Update state
         self.last_velocity = new_velocity
@@ -561,3 +546,26 @@ class HumanizeVelocityEffect(MidiEffect):
         """Reset state at start of sequence."""
         self._reset_state()
         return events
+
+
+# --- Effect factories ---
+@EffectRegistry.register('tape_wobble')
+def _create_tape_wobble(effect_conf: Dict, rng: Optional[random.Random] = None) -> TapeWobbleEffect:
+    """Build a TapeWobbleEffect from its CLI configuration."""
+    config = TapeWobbleConfiguration(
+        bend_up_cents=effect_conf.get('wow_depth', DEFAULT_BEND_UP_CENTS),
+        bend_down_cents=effect_conf.get('wow_depth', DEFAULT_BEND_DOWN_CENTS),
+        randomness=effect_conf.get('randomness', DEFAULT_RANDOMNESS),
+        depth_units=effect_conf.get('depth_units', 'cents'),
+        pitch_bend_update_rate=effect_conf.get('flutter_rate_hz', DEFAULT_PITCH_BEND_UPDATE_RATE)
+    )
+    return TapeWobbleEffect(config, rng)
+
+@EffectRegistry.register('humanize_velocity')
+def _create_humanize_velocity(effect_conf: Dict, rng: Optional[random.Random] = None) -> HumanizeVelocityEffect:
+    """Build a HumanizeVelocityEffect from its CLI configuration, clamping the range to 0..MAX_HUMANIZE_RANGE."""
+    humanization_range = effect_conf.get('humanization_range', DEFAULT_HUMANIZE_RANGE)
+    config = HumanizeVelocityConfiguration(
+        humanization_range=max(0, min(MAX_HUMANIZE_RANGE, humanization_range))
+    )
+    return HumanizeVelocityEffect(config, rng)
@@ -12,7 +12,8 @@ from typing import TypedDict, List, Dict, Union, Optional, Tuple, TypeVar, Gener
 
 from .midi_types import (
     NoteValue, Velocity, Tick, MidiInstruction,
-    MIDI_PITCH_BEND_CENTER, MIDI_PITCH_BEND_MIN, MIDI_PITCH_BEND_MAX
+    MIDI_PITCH_BEND_CENTER, MIDI_PITCH_BEND_MIN, MIDI_PITCH_BEND_MAX,
+    DEFAULT_TICKS_PER_BEAT
 )
 
 class EffectType(Enum):
@@ -96,20 +97,31 @@ class EffectChain:
     
     def __init__(self):
         self.effects: List[MidiEffect] = []
+        # Effects applicable to each processing stage, kept in priority order
+        self._note_effects: List[MidiEffect] = []
+        self._sequence_effects: List[MidiEffect] = []
     
     def add_effect(self, effect: MidiEffect) -> None:
         """Add an effect to the chain."""
         self.effects.append(effect)
         # Sort by priority
         self.effects.sort(key=lambda x: x.config.priority)
+        # Effect types are fixed by each configuration, so resolve the stages once here
+        # rather than re-filtering on every note
+        self._note_effects = [
+            e for e in self.effects
+            if e.config.effect_type in (EffectType.NOTE_PROCESSOR, EffectType.HYBRID)
+        ]
+        self._sequence_effects = [
+            e for e in self.effects
+            if e.config.effect_type in (EffectType.SEQUENCE_PROCESSOR, EffectType.HYBRID)
+        ]
     
     def process_note(self, ctx: NoteContext) -> NoteContext:
         """Process a single note through all applicable effects."""
         current_ctx = ctx.copy()
-        for effect in self.effects:
-            if effect.config.enabled and effect.config.effect_type in [
-                EffectType.NOTE_PROCESSOR, EffectType.HYBRID
-            ]:
+        for effect in self._note_effects:
+            if effect.config.enabled:
                 current_ctx = effect.process_note_context(current_ctx)
                 current_ctx['processed_by'].append(effect.__class__.__name__)
         return current_ctx
@@ -119,10 +131,8 @@ class EffectChain:
                         options: Dict) -> List[Union[MidiInstruction, Tuple]]:
         """Process the complete sequence through all applicable effects."""
         current_events = events
-        for effect in self.effects:
-            if effect.config.enabled and effect.config.effect_type in [
-                EffectType.SEQUENCE_PROCESSOR, EffectType.HYBRID
-            ]:
+        for effect in self._sequence_effects:
+            if effect.config.enabled:
                 current_events = effect.process_sequence(current_events, options)
         return current_events
 
@@ -135,18 +145,19 @@ def create_note_context(
     **kwargs
 ) -> NoteContext:
     """Create a new note context with default values."""
+    # Called once per generated note, so read each option only once
+    ticks_per_beat = options.get('ticks_per_beat', DEFAULT_TICKS_PER_BEAT)
+    bpm = options.get('bpm', 120)
     return NoteContext(
         note=note,
         velocity=velocity,
         channel=kwargs.get('channel', 0),
         tick=tick,
         duration_ticks=kwargs.get('duration_ticks'),
-        time_seconds=(tick / options.get('ticks_per_beat', 480)) * 
-                    (60.0 / options.get('bpm', 120)),
-        bpm=options.get('bpm', 120),
-        beat_position=(tick % options.get('ticks_per_beat', 480)) / 
-                     options.get('ticks_per_beat', 480),
-        bar_position=int(tick / (options.get('ticks_per_beat', 480) * 4)),
+        time_seconds=(tick / ticks_per_beat) * (60.0 / bpm),
+        bpm=bpm,
+        beat_position=(tick % ticks_per_beat) / ticks_per_beat,
+        bar_position=int(tick / (ticks_per_beat * 4)),
         generation_type=options.get('generation_type', 'arpeggio'),
         is_first_note=kwargs.get('is_first_note', False),
         is_last_note=kwargs.get('is_last_note', False),
@@ -18,8 +18,9 @@ from .midi_types import (
 
 # Removed calculate_note_length function as it's overcomplicated for fixed 16th notes
 
-# Type alias for structured MIDI events
-MidiEvent = Tuple[int, int, int, int] # (note, start_tick, duration_tick, velocity)
+def _event_sort_key(event: Tuple) -> Tuple[int, bool]:
+    """Sort key placing events in tick order, with note_offs before other events on the same tick."""
+    return (event[1], event[0] != 'note_off')
 
 class MidiProcessor:
     """Handles MIDI event processing and effect application."""
@@ -170,39 +171,45 @@ def create_midi_file(
     # Set tempo
     track.append(mido.MetaMessage('set_tempo', tempo=mido.bpm2tempo(bpm)))
     
+    # Order events by tick (note_offs first on ties) so delta times are never negative
+    timed_events = sorted(
+        (event for event in processed_events
+         if isinstance(event, tuple) and isinstance(event[0], str)),
+        key=_event_sort_key
+    )
+    
     # Convert all events to MIDI messages
+    append = track.append
+    Message = mido.Message
     last_tick = 0
-    for event in processed_events:
-        if isinstance(event, tuple):
-            if isinstance(event[0], str):  # New format
-                msg_type, tick, *params = event
-                delta_tick = tick - last_tick
-                
-                if msg_type == 'note_on':
-                    track.append(mido.Message('note_on',
-                                           note=params[0],
-                                           velocity=params[1],
-                                           channel=params[2],
-                                           time=delta_tick))
-                elif msg_type == 'note_off':
-                    track.append(mido.Message('note_off',
-                                           note=params[0],
-                                           velocity=params[1],
-                                           channel=params[2],
-                                           time=delta_tick))
-                elif msg_type == 'pitch_bend':
-                    track.append(mido.Message('pitchwheel',
-                                           pitch=params[0],
-                                           channel=params[1],
-                                           time=delta_tick))
-                elif msg_type == 'control_change':
-                    track.append(mido.Message('control_change',
-                                           control=params[0],
-                                           value=params[1],
-                                           channel=params[2],
-                                           time=delta_tick))
-                
-                last_tick = tick
+    for msg_type, tick, *params in timed_events:
+        delta_tick = tick - last_tick
+        
+        if msg_type == 'note_on':
+            append(Message('note_on',
+                           note=params[0],
+                           velocity=params[1],
+                           channel=params[2],
+                           time=delta_tick))
+        elif msg_type == 'note_off':
+            append(Message('note_off',
+                           note=params[0],
+                           velocity=params[1],
+                           channel=params[2],
+                           time=delta_tick))
+        elif msg_type == 'pitch_bend':
+            append(Message('pitchwheel',
+                           pitch=params[0],
+                           channel=params[1],
+                           time=delta_tick))
+        elif msg_type == 'control_change':
+            append(Message('control_change',
+                           control=params[0],
+                           value=params[1],
+                           channel=params[2],
+                           time=delta_tick))
+        
+        last_tick = tick
     
     mid.save(filename)
     return filename
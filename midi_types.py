@@ -5,7 +5,7 @@ This module provides centralized type definitions and constants for MIDI operati
 with a focus on pitch bend functionality and performance optimization.
 """
 
-from typing import Union, Tuple, Literal, TypeVar, List
+from typing import NamedTuple, Union, Tuple, Literal, TypeVar, List
 
 # Type Definitions
 NoteValue = int  # 0-127
@@ -22,6 +22,13 @@ MidiInstruction = Union[
     Tuple[Literal['control_change'], Tick, int, int, Channel],         # (type, tick, control, value, channel)
 ]
 
+# Structured note event produced by the generators; still a plain tuple for legacy consumers
+class MidiEvent(NamedTuple):
+    note: NoteValue
+    start_tick: Tick
+    duration_tick: Tick
+    velocity: Velocity
+
 # MIDI Constants
 MIDI_PITCH_BEND_MIN = -8192  # MIDO's minimum pitch bend value
 MIDI_PITCH_BEND_MAX = 8191   # MIDO's maximum pitch bend value
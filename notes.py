@@ -1,19 +1,42 @@
 from typing import List
 
-def note_str_to_midi(note_str: str) -> int:
+NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+
+def _parse_note_str(note_str: str) -> int:
     """
-    Converts a note string like 'E3' to its MIDI note number.
+    Parses a note string like 'E3' into its MIDI note number.
 
     :param note_str: String representing a note, e.g., 'E3', 'G#4'.
     :return: Corresponding MIDI note number.
     """
-    note_names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
     note = note_str[:-1]  # Remove the octave number
     octave = int(note_str[-1]) + 1  # MIDI starts at -1 for C0, so we add 1
-    
-    index = note_names.index(note)
+
+    index = NOTE_NAMES.index(note)
     return index + (octave * 12)
 
+# Every valid note string is known up front, so parse them all once at import
+_NOTE_STR_TO_MIDI = {
+    f"{name}{octave}": _parse_note_str(f"{name}{octave}")
+    for name in NOTE_NAMES for octave in range(10)
+}
+
+def note_str_to_midi(note_str: str) -> int:
+    """
+    Converts a note string like 'E3' to its MIDI note number.
+
+    :param note_str: String representing a note, e.g., 'E3', 'G#4'.
+    :return: Corresponding MIDI note number.
+    """
+    try:
+        return _NOTE_STR_TO_MIDI[note_str]
+    except KeyError:
+        # Fall back to parsing so invalid input raises the same errors as before
+        return _parse_note_str(note_str)
+
+# MIDI note numbers only span 0-127, so name them all once at import
+_MIDI_TO_NOTE_NAME = [f"{NOTE_NAMES[note % 12]}{note // 12 - 1}" for note in range(128)]
+
 def note_to_name(note: int) -> str:
     """
     Converts a MIDI note number to its musical name.
@@ -21,6 +44,7 @@ def note_to_name(note: int) -> str:
     :param note: MIDI note number.
     :return: String representation of the note (e.g., 'C4').
     """
-    notes = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+    if 0 <= note < 128:
+        return _MIDI_TO_NOTE_NAME[note]
     octave = note // 12 - 1
-    return f"{notes[note % 12]}{octave}"
+    return f"{NOTE_NAMES[note % 12]}{octave}"
@@ -0,0 +1,19 @@
+"""
+Shared support for the option dataclasses that generators read from the CLI options dict.
+"""
+
+from dataclasses import fields
+from typing import Dict, Type, TypeVar
+
+_OptionsT = TypeVar('_OptionsT', bound='FromOptionsMixin')
+
+class FromOptionsMixin:
+    """Adds `from_options` to a dataclass whose field names match keys of the CLI options dict."""
+
+    @classmethod
+    def from_options(cls: Type[_OptionsT], options: Dict) -> _OptionsT:
+        """Build the options from the CLI options dict; missing or None entries keep their defaults."""
+        return cls(**{
+            f.name: options[f.name] for f in fields(cls)
+            if options.get(f.name) is not None
+        })